@@ -1,5 +1,7 @@
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
 from test_backend.base.models import TestBaseModel
@@ -112,3 +114,8 @@ class User(AbstractUser, TestBaseModel):
                 "username",
             ],
         ]
+
+        indexes = [
+            GinIndex(OpClass(Upper("username"), name="gin_trgm_ops"), name="users_username_trgm"),
+            GinIndex(OpClass(Upper("last_name"), name="gin_trgm_ops"), name="users_last_name_trgm"),
+        ]
@@ -1,12 +1,15 @@
 import graphene
 from graphene_django import DjangoObjectType
-from django.db.models import Q
 
 from test_backend.Authentication.models import User
+from test_backend.base.schemas.loaders import load_by_lookup
 from test_backend.base.schemas import (
     resolve_with_pagination,
     check_auth,
     PageInfoType,
+    CountModeEnum,
+    SearchModeEnum,
+    TextSearch,
     FilterTypeInput,
     SortTypeInput,
 )
@@ -22,6 +25,9 @@ class UserType(DjangoObjectType):
         exclude = ("password",)
 
 
+user_search = TextSearch(("username", "last_name"))
+
+
 class PaginatedUsersType(graphene.ObjectType):
     """
     A type to return a paginated result for Users
@@ -50,26 +56,34 @@ class Query(graphene.ObjectType):
         sort=graphene.List(UserSortTypeInput),
         page_size=graphene.Int(),
         page=graphene.Int(),
+        after=graphene.String(description="Returns the items after this cursor, instead of a page"),
+        before=graphene.String(description="Returns the items before this cursor, instead of a page"),
+        count_mode=graphene.Argument(CountModeEnum, description="How totalCount is computed, exact by default"),
+        search_mode=graphene.Argument(SearchModeEnum, description="How search is matched, contains by default"),
     )
 
     def resolve_user(self, info, id=None, username=None):
         check_auth(info)
 
-        if id:
-            return User.objects.get(pk=id)
+        # all the user fields of the query are loaded at once
+        user = load_by_lookup(
+            info, UserType, {"id": "pk", "username": "username"}, id=id, username=username
+        )
+        if user is None and (id or username):
+            raise User.DoesNotExist("User matching query does not exist.")
 
-        if username:
-            return User.objects.get(username=username)
+        return user
 
-    def resolve_all_users(self, info, search=None, filters=None, sort=None, page_size=10, page=1):
+    def resolve_all_users(self, info, search=None, filters=None, sort=None, page_size=10, page=1, after=None, before=None, count_mode=None, search_mode=None):
         return resolve_with_pagination(
             User,
             info,
-            (Q(username__icontains=search) | Q(last_name__icontains=search))
-            if search
-            else None,
+            user_search(search, search_mode) if search else None,
             filters,
             sort,
             page_size,
             page,
+            after,
+            before,
+            count_mode,
         )
\ No newline at end of file
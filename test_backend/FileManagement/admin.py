@@ -3,3 +3,7 @@ from django.contrib import admin
 from .models import *
 
 admin.site.register(File)
+admin.site.register(UploadSession)
+admin.site.register(Blob)
+admin.site.register(FileJob)
+admin.site.register(FileChange)
@@ -1,6 +1,23 @@
+import os
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class FileManagementConfig(AppConfig):
     name = "test_backend.FileManagement"
     verbose_name = "File Management"
+
+    def ready(self):
+        # must exist before the system checks run (files.E001), it is inside
+        # MEDIA_ROOT by default, which a new volume doesn't have yet
+        if settings.FILE_UPLOAD_TEMP_DIR:
+            try:
+                os.makedirs(settings.FILE_UPLOAD_TEMP_DIR, exist_ok=True)
+            except OSError:
+                # reported by the checks
+                pass
+
+        from test_backend.FileManagement import signals  # noqa: F401
+        # invalidates the cached query results on writes, in every process
+        from test_backend.base import result_cache  # noqa: F401
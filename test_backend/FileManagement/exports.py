@@ -0,0 +1,131 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from graphql import GraphQLError, GraphQLList, coerce_input_value
+
+from test_backend.FileManagement.models import File
+from test_backend.FileManagement.schemas.queries.file import file_search
+from test_backend.base.schemas.pagination import filter_queryset, get_ordering
+from test_backend.schema import schema
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# columns exported when none are requested
+DEFAULT_FIELDS = [
+    "id", "name", "mime_type", "detected_mime_type", "size", "sha256",
+    "file_metadata", "created_at", "updated_at",
+]
+
+# rows written to the response at a time
+ROWS_PER_CHUNK = 500
+
+
+def coerce_argument(type_name, value, is_list=False):
+    """
+    Parses a JSON value of an input type of the GraphQL schema, as it
+    would be received by a resolver.
+    """
+    input_type = schema.graphql_schema.get_type(type_name)
+    if is_list:
+        input_type = GraphQLList(input_type)
+
+    def on_error(path, invalid_value, error):
+        raise error
+
+    return coerce_input_value(value, input_type, on_error)
+
+
+def get_export_queryset(params):
+    """
+    Returns the values of the files to export, filtered, searched and
+    sorted like in allFiles. The params are the arguments of allFiles, as
+    JSON, and the fields to export.
+    """
+    fields = params.get("fields") or DEFAULT_FIELDS
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    valid_fields = {field.name for field in File._meta.concrete_fields}
+    for field in fields:
+        if field not in valid_fields:
+            raise GraphQLError("Can't export field %s" % field)
+
+    filters = params.get("filters")
+    if filters:
+        filters = coerce_argument("FileFilterTypeInput", filters)
+
+    sort = params.get("sort")
+    if sort:
+        sort = coerce_argument("FileSortTypeInput", sort, is_list=True)
+
+    search = params.get("search")
+    if search:
+        search_mode = params.get("searchMode")
+        if search_mode:
+            search_mode = coerce_argument("SearchModeEnum", search_mode)
+        search = file_search(search, search_mode)
+
+    queryset = filter_queryset(File, search, filters, get_ordering(sort, File))
+    return queryset.values(*fields), fields
+
+
+def _chunks(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def iter_ndjson(rows):
+    """
+    Yields the rows as JSON lines.
+    """
+    return _chunks(json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in rows)
+
+
+class _Line:
+    # csv.writer target that returns the line instead of storing it
+    def write(self, line):
+        return line
+
+
+def iter_csv(rows, fields):
+    """
+    Yields the rows as CSV, with a header. JSON values are written as JSON.
+    """
+    writer = csv.writer(_Line())
+    encoder = DjangoJSONEncoder()
+
+    def encode(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, cls=DjangoJSONEncoder)
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        return encoder.default(value)
+
+    def lines():
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([encode(row[field]) for field in fields])
+
+    return _chunks(lines())
+
+
+def iter_export(queryset, fields, export_format):
+    """
+    Streams the rows of the queryset with a server-side cursor, reading
+    EXPORT_CHUNK_SIZE rows at a time, so the memory used doesn't depend on
+    the number of rows.
+    """
+    rows = queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    if export_format == "csv":
+        return iter_csv(rows, fields)
+    return iter_ndjson(rows)
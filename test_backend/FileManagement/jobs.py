@@ -0,0 +1,98 @@
+import logging
+import os
+import socket
+import time
+
+from django.db import DatabaseError, close_old_connections, transaction
+
+from test_backend.base.result_cache import bump_versions
+from test_backend.FileManagement.models import File, FileChange, FileJob
+from test_backend.FileManagement.sniffing import HEAD_SIZE, media_info, sniff_mime_type
+
+logger = logging.getLogger(__name__)
+
+# registered tasks by name, they receive the File to process and return
+# a JSON serializable result
+TASKS = {}
+
+
+def task(name):
+    """
+    Registers a function as a post-processing task.
+    """
+
+    def register(func):
+        TASKS[name] = func
+        return func
+
+    return register
+
+
+def merge_file_metadata(file, values):
+    """
+    Adds values to the metadata of the file, keys already set by the
+    client are kept.
+    """
+    with transaction.atomic():
+        locked = File.objects.select_for_update().get(pk=file.pk)
+        locked.file_metadata = {**values, **(locked.file_metadata or {})}
+        locked.save(update_fields=["file_metadata", "updated_at"])
+
+
+@task("media_info")
+def extract_media_info(file):
+    with file.file.open("rb") as content:
+        detected = file.detected_mime_type
+        if detected is None:
+            # stored before the type was detected on upload
+            detected = sniff_mime_type(content.read(HEAD_SIZE))
+            content.seek(0)
+            File.objects.filter(pk=file.pk).update(detected_mime_type=detected)
+            bump_versions(File)
+            FileChange.objects.record(FileChange.UPDATED, [file.pk])
+        info = media_info(content, detected)
+
+    if info:
+        merge_file_metadata(file, info)
+    return {"detectedMimeType": detected, **info}
+
+
+def run_job(job):
+    func = TASKS.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task {job.task}")
+        result = func(job.file)
+    except Exception as e:
+        logger.exception("Job %s (%s) of file %s failed", job.pk, job.task, job.file_id)
+        saved = job.fail(e)
+    else:
+        saved = job.succeed(result)
+
+    if not saved:
+        logger.warning("Job %s (%s) was deleted or claimed again while it ran", job.pk, job.task)
+
+
+def run_worker(poll_interval, once=False):
+    """
+    Runs the queued jobs one after the other. Several workers, in this
+    or other hosts, can share the same queue.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("Worker %s started", worker)
+
+    while True:
+        close_old_connections()
+
+        job = FileJob.objects.claim(worker)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            run_job(job)
+        except DatabaseError:
+            # the job is claimed again once its lock times out
+            logger.exception("Job %s (%s) could not be saved", job.pk, job.task)
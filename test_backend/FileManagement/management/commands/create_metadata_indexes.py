@@ -0,0 +1,85 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from test_backend.base.metadata_columns import KEY_CASTS, parse_metadata_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the expression indexes of the sorts on keys of a JSON "
+        "field, e.g. recorded_at:datetime for sort: {field: file_metadata, "
+        "key: \"recorded_at\", cast: DATETIME}, so the sorted pages are read "
+        "from the index. On PostgreSQL the indexes are built concurrently, "
+        "without blocking writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "keys",
+            nargs="+",
+            help=(
+                "Keys to index as [key]:[cast], dot separated for nested keys, "
+                "the cast is one of %s, text by default." % ", ".join(KEY_CASTS)
+            ),
+        )
+        parser.add_argument(
+            "--model",
+            default="FileManagement.File",
+            help="Label of the model with the JSON field.",
+        )
+        parser.add_argument(
+            "--field",
+            default="file_metadata",
+            help="Name of the JSON field.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the indexes instead of creating them.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the SQL of the indexes.",
+        )
+
+    def handle(self, *args, keys, model, field, drop, dry_run, **options):
+        try:
+            model = apps.get_model(model)
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        indexes = []
+        for key in keys:
+            path, _, cast = key.partition(":")
+            column = parse_metadata_key(model, "__".join([field, *path.split("."), cast or "text"]))
+            if column is None:
+                raise CommandError(f"{key} is not a valid key of {model.__name__}.{field}")
+            if not hasattr(column, "index"):
+                self.stdout.write(f"{key} is stored in the indexed column {column.name}")
+                continue
+            indexes.append(column.index(model))
+
+        existing = set()
+        with connection.cursor() as cursor:
+            existing = set(connection.introspection.get_constraints(cursor, model._meta.db_table))
+
+        concurrently = connection.vendor == "postgresql"
+        with connection.schema_editor(atomic=False, collect_sql=dry_run) as schema_editor:
+            for index in indexes:
+                if drop != (index.name in existing):
+                    self.stdout.write(f"{index.name} {'does not exist' if drop else 'already exists'}")
+                    continue
+
+                method = schema_editor.remove_index if drop else schema_editor.add_index
+                if concurrently:
+                    method(model, index, concurrently=True)
+                else:
+                    method(model, index)
+                if not dry_run:
+                    self.stdout.write(f"{'Dropped' if drop else 'Created'} {index.name}")
+
+            if dry_run:
+                for sql in schema_editor.collected_sql:
+                    self.stdout.write(sql)
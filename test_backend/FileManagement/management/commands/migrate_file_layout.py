@@ -0,0 +1,116 @@
+import logging
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from test_backend.base.result_cache import bump_versions
+from test_backend.FileManagement.models import Blob, File, FileChange
+from test_backend.FileManagement.storage import blob_storage
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the stored files to the current blob layout: files uploaded "
+        "before the content-addressable storage, and blobs stored with other "
+        "FILE_STORAGE_FANOUT_* settings. It can be stopped and run again, "
+        "and uploads keep working while it runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of files moved in each batch.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between batches, to limit the load on the disks.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the files to move.",
+        )
+
+    def handle(self, *args, batch_size, sleep, dry_run, **options):
+        directory = File._meta.get_field("file").upload_to.rstrip("/")
+
+        # files already in the layout are skipped, so a new run continues
+        # where the last one stopped
+        pending = File.objects.exclude(file="").exclude(
+            file__regex=blob_storage.blob_name_regex(directory)
+        )
+        if dry_run:
+            self.stdout.write(f"{pending.count()} files to move")
+            return
+
+        moved = skipped = 0
+        last_pk = None
+        while True:
+            batch = pending.order_by("pk")
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(batch.values_list("pk", "file", "sha256")[:batch_size])
+            if not batch:
+                break
+
+            for pk, name, sha256 in batch:
+                if self.move_file(directory, pk, name, sha256):
+                    moved += 1
+                else:
+                    skipped += 1
+            last_pk = batch[-1][0]
+
+            self.stdout.write(f"{moved} files moved, {skipped} skipped")
+            time.sleep(sleep)
+
+        self.stdout.write(f"Done, {moved} files moved, {skipped} skipped")
+
+    def move_file(self, directory, pk, name, sha256):
+        """
+        Links the content of a file to its blob name, points the row to it
+        and removes the old name when no other file uses it.
+        """
+        path = blob_storage.path(name)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            logger.warning("Content of file %s not found at %s", pk, name)
+            return False
+
+        digest = sha256 or blob_storage.digest(name) or blob_storage.file_digest(path)
+        new_name = blob_storage.blob_name(directory, digest)
+        blob_storage.link(path, new_name)
+
+        with transaction.atomic():
+            # the file may have been changed since it was read
+            if not File.objects.filter(pk=pk, file=name).update(file=new_name, sha256=digest, size=size):
+                return False
+            bump_versions(File)
+            FileChange.objects.record(FileChange.UPDATED, [pk])
+
+            if not sha256:
+                # stored before the blobs were counted
+                Blob.objects.acquire(digest, new_name, size)
+
+        # uploads of the same content take the blob lock to get its name,
+        # see Blob.objects.acquire
+        with transaction.atomic():
+            blob = Blob.objects.select_for_update().filter(digest=digest).first()
+            if File.objects.filter(file=name).exists():
+                return True
+
+            if blob is not None and blob.name == name:
+                blob.name = new_name
+                blob.save(update_fields=["name", "updated_at"])
+                bump_versions(Blob)
+            transaction.on_commit(lambda: blob_storage.delete(name))
+
+        return True
@@ -0,0 +1,54 @@
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from test_backend.FileManagement.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Runs the post-processing jobs of the uploaded files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=settings.FILE_JOBS_WORKER_PROCESSES,
+            help="Number of worker processes.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.FILE_JOBS_POLL_INTERVAL,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty.",
+        )
+
+    def handle(self, *args, processes, poll_interval, once, **options):
+        if processes <= 1:
+            run_worker(poll_interval, once)
+            return
+
+        # forked processes must open their own database connections
+        connections.close_all()
+
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=run_worker, args=(poll_interval, once))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        self.stdout.write(f"Started {processes} workers")
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
@@ -0,0 +1,40 @@
+# Generated by Django 4.1.6 on 2026-10-18 08:43
+
+from django.conf import settings
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import test_backend.FileManagement.models.upload_session
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('FileManagement', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='created on')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='modified on')),
+                ('name', models.CharField(max_length=255, verbose_name='File name')),
+                ('mime_type', models.CharField(max_length=255, verbose_name='MIME Type of file')),
+                ('file_metadata', models.JSONField(blank=True, null=True, verbose_name='Metadata of the file')),
+                ('total_size', models.BigIntegerField(verbose_name='Total size in bytes')),
+                ('chunk_size', models.PositiveIntegerField(blank=True, default=test_backend.FileManagement.models.upload_session.default_chunk_size, verbose_name='Chunk size in bytes')),
+                ('received_chunks', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), blank=True, default=list, size=None, verbose_name='Received chunks')),
+                ('file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='FileManagement.file', verbose_name='File created on finalize')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Owner of the session')),
+            ],
+            options={
+                'verbose_name': 'Upload session',
+                'verbose_name_plural': 'Upload sessions',
+                'db_table': 'UploadSessions',
+            },
+        ),
+    ]
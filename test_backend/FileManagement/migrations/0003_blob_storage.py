@@ -0,0 +1,42 @@
+# Generated by Django 4.1.6 on 2026-10-18 08:44
+
+from django.db import migrations, models
+import test_backend.FileManagement.storage
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FileManagement', '0002_upload_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='created on')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='modified on')),
+                ('digest', models.CharField(max_length=64, unique=True, verbose_name='SHA-256 digest')),
+                ('name', models.CharField(max_length=255, verbose_name='Name in the storage')),
+                ('size', models.BigIntegerField(verbose_name='Size in bytes')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Number of files using it')),
+            ],
+            options={
+                'verbose_name': 'Blob',
+                'verbose_name_plural': 'Blobs',
+                'db_table': 'Blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, null=True, verbose_name='SHA-256 of the content'),
+        ),
+        migrations.AlterField(
+            model_name='file',
+            name='file',
+            field=models.FileField(storage=test_backend.FileManagement.storage.ContentAddressableStorage(), upload_to='file_uploads/'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.6 on 2026-10-18 08:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import test_backend.FileManagement.models.file_job
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FileManagement', '0003_blob_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='created on')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='modified on')),
+                ('task', models.CharField(max_length=100, verbose_name='Task name')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=test_backend.FileManagement.models.file_job.default_max_attempts, verbose_name='Maximum attempts')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run after')),
+                ('locked_by', models.CharField(blank=True, max_length=255, verbose_name='Worker running it')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Locked on')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Result of the task')),
+                ('file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='FileManagement.file', verbose_name='File to process')),
+            ],
+            options={
+                'verbose_name': 'File job',
+                'verbose_name_plural': 'File jobs',
+                'db_table': 'FileJobs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='filejob',
+            index=models.Index(fields=['status', 'run_after'], name='filejobs_status_run_after'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.6 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FileManagement', '0004_file_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='detected_mime_type',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, verbose_name='MIME Type detected from the content'),
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='size',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Size in bytes'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.1.6 on 2026-10-18 08:59
+
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+import django.db.models.fields.json
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FileManagement', '0005_file_size_and_detected_type'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='file',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='files_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='file',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector(django.db.models.fields.json.KeyTextTransform('species', 'file_metadata'), django.db.models.fields.json.KeyTextTransform('device_id', 'file_metadata'), django.db.models.fields.json.KeyTextTransform('deployment', 'file_metadata'), config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), name='files_search_vector'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.6 on 2026-10-18 09:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FileManagement', '0006_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='file',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['file_metadata'], name='files_metadata_path_ops', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations, models
+
+from test_backend.base.metadata_columns import MetadataColumn
+
+# File.metadata_columns when this migration was written, the SQL is built
+# by the columns themselves
+COLUMNS = [
+    MetadataColumn("file_metadata", "device_id", "metadata_device_id", models.CharField()),
+    MetadataColumn("file_metadata", "deployment", "metadata_deployment", models.CharField()),
+    MetadataColumn("file_metadata", "recorded_at", "metadata_recorded_at", models.DateTimeField()),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FileManagement', '0007_metadata_path_ops_index'),
+    ]
+
+    operations = [
+        # generated columns need immutable expressions, the casts to numbers
+        # and timestamps are wrapped to make invalid values null, and don't
+        # depend on the timezone or date style of the session
+        migrations.RunSQL(
+            sql=[
+                """
+                CREATE FUNCTION metadata_double(value text) RETURNS double precision
+                LANGUAGE plpgsql IMMUTABLE AS $$
+                BEGIN
+                    RETURN value::double precision;
+                EXCEPTION WHEN others THEN
+                    RETURN NULL;
+                END;
+                $$
+                """,
+                """
+                CREATE FUNCTION metadata_timestamptz(value text) RETURNS timestamptz
+                LANGUAGE plpgsql IMMUTABLE SET timezone = 'UTC' SET datestyle = 'ISO, YMD' AS $$
+                BEGIN
+                    RETURN value::timestamptz;
+                EXCEPTION WHEN others THEN
+                    RETURN NULL;
+                END;
+                $$
+                """,
+            ],
+            reverse_sql=[
+                "DROP FUNCTION metadata_timestamptz(text)",
+                "DROP FUNCTION metadata_double(text)",
+            ],
+        ),
+        migrations.RunSQL(
+            sql=[sql for column in COLUMNS for sql in column.add_column_sql("Files")],
+            reverse_sql=[
+                sql for column in reversed(COLUMNS) for sql in column.remove_column_sql("Files")
+            ],
+        ),
+    ]
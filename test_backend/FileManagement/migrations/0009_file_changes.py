@@ -0,0 +1,43 @@
+# Generated by Django 4.1.6 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+def record_existing_files(apps, schema_editor):
+    # the existing files are the first changes, so clients can start a
+    # copy of the catalog from the log
+    File = apps.get_model("FileManagement", "File")
+    FileChange = apps.get_model("FileManagement", "FileChange")
+    file_ids = File.objects.order_by("created_at", "pk").values_list("pk", flat=True)
+    batch = []
+    for file_id in file_ids.iterator(chunk_size=2000):
+        batch.append(FileChange(action="created", file_id=file_id))
+        if len(batch) >= 2000:
+            FileChange.objects.bulk_create(batch)
+            batch = []
+    FileChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FileManagement', '0008_promoted_metadata_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('file_id', models.UUIDField(db_index=True, verbose_name='Changed file')),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10, verbose_name='Action')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='changed on')),
+            ],
+            options={
+                'verbose_name': 'File change',
+                'verbose_name_plural': 'File changes',
+                'db_table': 'FileChanges',
+            },
+        ),
+        migrations.RunPython(record_existing_files, migrations.RunPython.noop),
+    ]
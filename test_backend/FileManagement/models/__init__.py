@@ -1,5 +1,13 @@
+from .blob import Blob
 from .file import File
+from .file_change import FileChange
+from .file_job import FileJob
+from .upload_session import UploadSession
 
 __all__ = [
+    "Blob",
     "File",
+    "FileChange",
+    "FileJob",
+    "UploadSession",
 ]
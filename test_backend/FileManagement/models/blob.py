@@ -0,0 +1,96 @@
+from django.apps import apps
+from django.contrib.gis.db import models
+from django.db import transaction
+from django.db.models import F
+
+from test_backend.base.models import TestBaseModel
+from test_backend.FileManagement.storage import blob_storage
+
+
+class BlobManager(models.Manager):
+    """
+    Keeps count of the File rows that point to each stored blob.
+    """
+
+    def acquire(self, digest, name, size, count=1, content=None):
+        """
+        Adds references to the blob with the given digest and returns the
+        name of its content, which is the one already stored when the blob
+        exists, even under another layout. The content is written again
+        when the last release deleted it after the caller found it stored.
+        """
+        with transaction.atomic():
+            blob, _ = self.select_for_update().get_or_create(
+                digest=digest, defaults={"name": name, "size": size}
+            )
+            # a release that removed the content holds the lock until the
+            # row is gone, so a missing content can't be deleted after this
+            if content is not None and not blob_storage.exists(blob.name):
+                blob_storage.restore(blob.name, content)
+
+            blob.ref_count = F("ref_count") + count
+            blob.save(update_fields=["ref_count", "updated_at"])
+        return blob.name
+
+    def release(self, digest):
+        """
+        Removes a reference to the blob with the given digest. The content
+        is deleted from the storage along with the last reference.
+        """
+        with transaction.atomic():
+            blob = self.select_for_update().filter(digest=digest).first()
+            if blob is None:
+                return
+
+            if blob.ref_count > 1:
+                blob.ref_count = F("ref_count") - 1
+                blob.save(update_fields=["ref_count", "updated_at"])
+                return
+
+            # the row is kept until the content is deleted, so uploads of
+            # the same content in the meantime wait for it, see acquire
+            blob.ref_count = 0
+            blob.save(update_fields=["ref_count", "updated_at"])
+            transaction.on_commit(lambda: self._delete_content(digest))
+
+    def _delete_content(self, digest):
+        with transaction.atomic():
+            blob = self.select_for_update().filter(digest=digest).first()
+            # the same content may have been uploaded again in the meantime
+            if blob is None or blob.ref_count > 0:
+                return
+
+            # uploads stored with other fan-out settings than the blob left
+            # a copy under the current layout
+            File = apps.get_model("FileManagement", "File")
+            directory = File._meta.get_field("file").upload_to.rstrip("/")
+            for name in {blob.name, blob_storage.blob_name(directory, digest)}:
+                blob_storage.delete(name)
+            blob.delete()
+
+
+class Blob(TestBaseModel):
+    """
+    A content stored once in the file storage, shared by all the files
+    with the same SHA-256 digest.
+    """
+
+    digest = models.CharField(verbose_name="SHA-256 digest", max_length=64, unique=True)
+
+    name = models.CharField(verbose_name="Name in the storage", max_length=255)
+
+    size = models.BigIntegerField(verbose_name="Size in bytes")
+
+    ref_count = models.PositiveIntegerField(verbose_name="Number of files using it", default=0)
+
+    objects = BlobManager()
+
+    def __str__(self):
+        return str(self.digest)
+
+    class Meta:
+        db_table = "Blobs"
+
+        verbose_name = "Blob"
+
+        verbose_name_plural = "Blobs"
@@ -1,7 +1,30 @@
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.db import transaction
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Upper
 
+from test_backend.base.metadata_columns import MetadataColumn
 from test_backend.base.models import TestBaseModel
+from test_backend.FileManagement.models.blob import Blob
+from test_backend.FileManagement.models.file_job import FileJob
+from test_backend.FileManagement.sniffing import HEAD_SIZE, sniff_mime_type
+from test_backend.FileManagement.storage import blob_storage
 
+# metadata keys included in the full text search of the files
+SEARCH_METADATA_KEYS = ("species", "device_id", "deployment")
+
+
+def file_search_vector():
+    """
+    Full text search vector of the files, the name weighs more than the
+    metadata. The search must use the same expression as the index.
+    """
+    metadata = [KeyTextTransform(key, "file_metadata") for key in SEARCH_METADATA_KEYS]
+    return SearchVector("name", weight="A", config="simple") + SearchVector(
+        *metadata, weight="B", config="simple"
+    )
 
 
 class File(TestBaseModel):
@@ -13,14 +36,104 @@ class File(TestBaseModel):
 
     file_metadata = models.JSONField(verbose_name="Metadata of the file", blank=True, null=True)
 
-    file = models.FileField(upload_to='file_uploads/')
+    file = models.FileField(upload_to='file_uploads/', storage=blob_storage)
+
+    sha256 = models.CharField(
+        verbose_name="SHA-256 of the content",
+        max_length=64,
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=True,
+    )
+
+    size = models.BigIntegerField(
+        verbose_name="Size in bytes", blank=True, null=True, editable=False
+    )
+
+    detected_mime_type = models.CharField(
+        verbose_name="MIME Type detected from the content",
+        max_length=255,
+        blank=True,
+        null=True,
+        editable=False,
+    )
+
+    # metadata keys used in most filters and sorts, kept in generated columns
+    # (see migration 0008) and filtered and sorted by their name
+    metadata_columns = [
+        MetadataColumn("file_metadata", "device_id", "metadata_device_id", models.CharField()),
+        MetadataColumn("file_metadata", "deployment", "metadata_deployment", models.CharField()),
+        MetadataColumn("file_metadata", "recorded_at", "metadata_recorded_at", models.DateTimeField()),
+    ]
 
     def __str__(self):
         return str(self.name)
 
+    def commit_file(self):
+        """
+        Stores the content in the storage, if not done yet, and sets its
+        digest, size and detected MIME type.
+        """
+        if self.file and not self.file._committed:
+            content = self.file.file
+            self.size = content.size
+            # uploads sniffed while received by ChecksumUploadHandler
+            self.detected_mime_type = getattr(content, "detected_content_type", None)
+            if not hasattr(content, "detected_content_type"):
+                content.seek(0)
+                self.detected_mime_type = sniff_mime_type(content.read(HEAD_SIZE))
+
+            self.file.save(self.file.name, content, save=False)
+            # kept to write the blob again if it is deleted meanwhile
+            self.stored_content = content
+        self.sha256 = blob_storage.digest(self.file.name) if self.file else None
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "file" not in update_fields:
+            return super().save(*args, **kwargs)
+
+        previous = None
+        if not self._state.adding:
+            previous = File.objects.filter(pk=self.pk).values_list("sha256", flat=True).first()
+
+        # store the content before the row, so its digest is already known
+        self.commit_file()
+
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {"sha256", "size", "detected_mime_type"}
+
+        with transaction.atomic():
+            changed = self.sha256 != previous
+            if changed and self.sha256:
+                # a blob stored with other fan-out settings keeps its name,
+                # see migrate_file_layout
+                self.file.name = Blob.objects.acquire(
+                    self.sha256,
+                    self.file.name,
+                    self.file.size if self.size is None else self.size,
+                    content=getattr(self, "stored_content", None),
+                )
+
+            super().save(*args, **kwargs)
+
+            if changed:
+                if previous:
+                    Blob.objects.release(previous)
+
+                # new content, process it in the background
+                FileJob.objects.enqueue([self])
+
     class Meta:
         db_table = "Files"
 
         verbose_name = "File"
 
         verbose_name_plural = "Files"
+
+        indexes = [
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="files_name_trgm"),
+            GinIndex(file_search_vector(), name="files_search_vector"),
+            GinIndex(fields=["file_metadata"], opclasses=["jsonb_path_ops"], name="files_metadata_path_ops"),
+        ]
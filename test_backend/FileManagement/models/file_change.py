@@ -0,0 +1,74 @@
+from django.contrib.gis.db import models
+from django.db import connections, router, transaction
+
+from test_backend.base.result_cache import bump_versions
+
+# key of the PostgreSQL advisory lock that orders the changes, see record
+CHANGE_LOG_LOCK = 0x46494C45
+
+
+class FileChangeManager(models.Manager):
+    """
+    Append-only log of the writes to the files, read by the clients that
+    keep a copy of the catalog.
+    """
+
+    def record(self, action, file_ids):
+        """
+        Adds a change with the given action for each file id. Call it
+        after writes that send no signals, like QuerySet.update() and
+        bulk_create().
+        """
+        using = router.db_for_write(self.model)
+        connection = connections[using]
+        with transaction.atomic(using=using):
+            if connection.vendor == "postgresql":
+                # the changes of concurrent transactions get their ids in the
+                # order they are committed, so a client that read up to a
+                # change never misses one committed later with a lower id
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CHANGE_LOG_LOCK])
+
+            changes = self.bulk_create(
+                [self.model(action=action, file_id=file_id) for file_id in file_ids]
+            )
+        bump_versions(self.model)
+        return changes
+
+
+class FileChange(models.Model):
+    """
+    A file created, updated or deleted. The ids grow in the order the
+    changes are committed.
+    """
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+    ACTION_CHOICES = (
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (DELETED, "Deleted"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+
+    # not a foreign key, the changes of deleted files are kept
+    file_id = models.UUIDField(verbose_name="Changed file", db_index=True)
+
+    action = models.CharField(verbose_name="Action", max_length=10, choices=ACTION_CHOICES)
+
+    created_at = models.DateTimeField(verbose_name="changed on", auto_now_add=True)
+
+    objects = FileChangeManager()
+
+    def __str__(self):
+        return f"{self.file_id} {self.action}"
+
+    class Meta:
+        db_table = "FileChanges"
+
+        verbose_name = "File change"
+
+        verbose_name_plural = "File changes"
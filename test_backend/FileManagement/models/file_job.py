@@ -0,0 +1,174 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.gis.db import models
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from test_backend.base.models import TestBaseModel
+from test_backend.base.result_cache import bump_versions
+
+
+def default_max_attempts():
+    return settings.FILE_JOBS_MAX_ATTEMPTS
+
+
+class FileJobManager(models.Manager):
+    """
+    Database backed queue of post-processing jobs for files.
+    """
+
+    def enqueue(self, files, tasks=None):
+        """
+        Queues the given tasks, or the default ones, for each file.
+        """
+        tasks = settings.FILE_JOBS_TASKS if tasks is None else tasks
+        jobs = self.bulk_create(
+            [self.model(file=file, task=task) for file in files for task in tasks]
+        )
+        bump_versions(self.model)
+        return jobs
+
+    def claim(self, worker):
+        """
+        Locks the next job ready to run for the given worker. Jobs locked by
+        a worker that died are claimed again once the lock times out.
+        """
+        now = timezone.now()
+        lock_expired = now - timedelta(seconds=settings.FILE_JOBS_LOCK_TIMEOUT)
+
+        # jobs whose worker died on each attempt, e.g. killed for running
+        # out of memory on a file, are not run again
+        lost = self.filter(
+            status=FileJob.RUNNING, locked_at__lt=lock_expired, attempts__gte=F("max_attempts")
+        ).update(
+            status=FileJob.FAILED,
+            last_error="The worker running the job stopped",
+            locked_by="",
+            locked_at=None,
+            updated_at=now,
+        )
+        if lost:
+            bump_versions(self.model)
+
+        with transaction.atomic():
+            job = (
+                self.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=FileJob.PENDING, run_after__lte=now)
+                    | Q(
+                        status=FileJob.RUNNING,
+                        locked_at__lt=lock_expired,
+                        attempts__lt=F("max_attempts"),
+                    )
+                )
+                .order_by("run_after")
+                .first()
+            )
+            if job is None:
+                return None
+
+            job.status = FileJob.RUNNING
+            job.locked_by = worker
+            job.locked_at = now
+            job.attempts += 1
+            job.save(update_fields=["status", "locked_by", "locked_at", "attempts", "updated_at"])
+
+        return job
+
+
+class FileJob(TestBaseModel):
+    """
+    A post-processing task to run on a file outside of the request
+    that uploaded it.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    file = models.ForeignKey(
+        "FileManagement.File",
+        verbose_name="File to process",
+        on_delete=models.CASCADE,
+        related_name="jobs",
+    )
+
+    task = models.CharField(verbose_name="Task name", max_length=100)
+
+    status = models.CharField(
+        verbose_name="Status", max_length=20, choices=STATUS_CHOICES, default=PENDING
+    )
+
+    attempts = models.PositiveSmallIntegerField(verbose_name="Attempts", default=0)
+
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name="Maximum attempts", default=default_max_attempts
+    )
+
+    run_after = models.DateTimeField(verbose_name="Run after", default=timezone.now)
+
+    locked_by = models.CharField(verbose_name="Worker running it", max_length=255, blank=True)
+
+    locked_at = models.DateTimeField(verbose_name="Locked on", blank=True, null=True)
+
+    last_error = models.TextField(verbose_name="Last error", blank=True)
+
+    result = models.JSONField(verbose_name="Result of the task", blank=True, null=True)
+
+    objects = FileJobManager()
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
+
+    class Meta:
+        db_table = "FileJobs"
+
+        verbose_name = "File job"
+
+        verbose_name_plural = "File jobs"
+
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="filejobs_status_run_after"),
+        ]
+
+    def succeed(self, result):
+        return self.finish(status=FileJob.DONE, result=result, last_error="")
+
+    def fail(self, error):
+        """
+        Queues the job again with an exponential delay, or marks it as
+        failed when it has no attempts left.
+        """
+        values = {"last_error": "".join(traceback.format_exception(error))}
+        if self.attempts < self.max_attempts:
+            delay = settings.FILE_JOBS_RETRY_DELAY * 2 ** (self.attempts - 1)
+            values.update(
+                status=FileJob.PENDING, run_after=timezone.now() + timedelta(seconds=delay)
+            )
+        else:
+            values["status"] = FileJob.FAILED
+        return self.finish(**values)
+
+    def finish(self, **values):
+        """
+        Saves the outcome of a run and unlocks the job. Returns False when
+        the job is gone, deleted along with its file, or was claimed again
+        by another worker since.
+        """
+        values.update(locked_by="", locked_at=None, updated_at=timezone.now())
+        updated = FileJob.objects.filter(pk=self.pk, locked_by=self.locked_by).update(**values)
+        for name, value in values.items():
+            setattr(self, name, value)
+        bump_versions(FileJob)
+        return bool(updated)
@@ -0,0 +1,167 @@
+import math
+import os
+
+from django.conf import settings
+from django.contrib.gis.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from test_backend.base.models import TestBaseModel
+
+
+def default_chunk_size():
+    return settings.UPLOAD_SESSION_CHUNK_SIZE
+
+
+class UploadSession(TestBaseModel):
+    """
+    A resumable upload. The client announces the file, sends it in
+    numbered chunks (in any order, re-sending is harmless) and finalizes
+    the session into a File once every chunk is stored.
+    """
+
+    name = models.CharField(verbose_name="File name", max_length=255, blank=False)
+
+    mime_type = models.CharField(
+        verbose_name="MIME Type of file", max_length=255, blank=False
+    )
+
+    file_metadata = models.JSONField(verbose_name="Metadata of the file", blank=True, null=True)
+
+    total_size = models.BigIntegerField(verbose_name="Total size in bytes")
+
+    chunk_size = models.PositiveIntegerField(
+        verbose_name="Chunk size in bytes", default=default_chunk_size, blank=True
+    )
+
+    received_chunks = ArrayField(
+        models.PositiveIntegerField(), verbose_name="Received chunks", default=list, blank=True
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name="Owner of the session",
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+        null=True,
+        blank=True,
+    )
+
+    file = models.ForeignKey(
+        "FileManagement.File",
+        verbose_name="File created on finalize",
+        on_delete=models.SET_NULL,
+        related_name="upload_sessions",
+        null=True,
+        blank=True,
+    )
+
+    def __str__(self):
+        return str(self.name)
+
+    class Meta:
+        db_table = "UploadSessions"
+
+        verbose_name = "Upload session"
+
+        verbose_name_plural = "Upload sessions"
+
+    @property
+    def data_path(self):
+        return os.path.join(settings.UPLOAD_SESSIONS_ROOT, f"{self.pk}.part")
+
+    @property
+    def finalize_path(self):
+        # the data is moved here before it's linked into the storage, so
+        # chunks written later don't change the stored blob
+        return os.path.join(settings.UPLOAD_SESSIONS_ROOT, f"{self.pk}.finalize")
+
+    @property
+    def chunk_count(self):
+        return max(1, math.ceil(self.total_size / self.chunk_size))
+
+    @property
+    def missing_chunks(self):
+        received = set(self.received_chunks)
+        return [index for index in range(self.chunk_count) if index not in received]
+
+    @property
+    def received_offsets(self):
+        return [index * self.chunk_size for index in sorted(self.received_chunks)]
+
+    @property
+    def bytes_received(self):
+        return sum(self.expected_chunk_size(index) for index in self.received_chunks)
+
+    @property
+    def is_complete(self):
+        return not self.missing_chunks
+
+    def clean(self):
+        if self.chunk_size is None:
+            self.chunk_size = default_chunk_size()
+        if self.total_size is not None and self.total_size < 0:
+            raise ValidationError({"total_size": "Total size can't be negative."})
+        if self.chunk_size <= 0 or self.chunk_size > settings.UPLOAD_SESSION_MAX_CHUNK_SIZE:
+            raise ValidationError(
+                {
+                    "chunk_size": "Chunk size must be between 1 and %s bytes."
+                    % settings.UPLOAD_SESSION_MAX_CHUNK_SIZE
+                }
+            )
+
+    def expected_chunk_size(self, index):
+        """
+        Size in bytes the chunk at index must have, the last one may be shorter.
+        """
+        if index < 0 or index >= self.chunk_count:
+            raise ValidationError(
+                {"index": "Chunk index must be between 0 and %s." % (self.chunk_count - 1)}
+            )
+        return min(self.chunk_size, self.total_size - index * self.chunk_size)
+
+    def write_chunk(self, index, pieces):
+        """
+        Writes the chunk at its offset in the session data file, streaming
+        the given iterable of bytes, and marks it as received.
+        """
+        if self.file_id:
+            raise ValidationError({"index": "Upload session is already finalized."})
+
+        expected = self.expected_chunk_size(index)
+        offset = index * self.chunk_size
+
+        os.makedirs(settings.UPLOAD_SESSIONS_ROOT, exist_ok=True)
+        fd = os.open(self.data_path, os.O_WRONLY | os.O_CREAT, 0o600)
+        written = 0
+        try:
+            for piece in pieces:
+                if written + len(piece) > expected:
+                    raise ValidationError(
+                        {"chunk": "Chunk %s must be %s bytes long." % (index, expected)}
+                    )
+                os.pwrite(fd, piece, offset + written)
+                written += len(piece)
+        finally:
+            os.close(fd)
+
+        if written != expected:
+            raise ValidationError(
+                {"chunk": "Chunk %s must be %s bytes long." % (index, expected)}
+            )
+
+        # lock the row so concurrent chunks don't overwrite each other's index
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=self.pk)
+            if index not in session.received_chunks:
+                session.received_chunks = sorted(session.received_chunks + [index])
+                session.save(update_fields=["received_chunks", "updated_at"])
+            self.received_chunks = session.received_chunks
+
+    def discard_data(self):
+        for path in (self.data_path, self.finalize_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -1,15 +1,18 @@
-from .queries import FileQuery
+from .queries import FileQuery, FileChangeQuery, UploadSessionQuery
 
-from .mutations import FileMutation
+from .mutations import FileMutation, UploadSessionMutation
 
 
 class FileManagementQuery(
-    FileQuery
+    FileQuery,
+    FileChangeQuery,
+    UploadSessionQuery,
 ):
     pass
 
 
 class FileManagementMutation(
-    FileMutation
+    FileMutation,
+    UploadSessionMutation,
 ):
     pass
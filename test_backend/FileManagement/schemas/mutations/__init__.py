@@ -1,5 +1,7 @@
 from .file import Mutation as FileMutation
+from .upload_session import Mutation as UploadSessionMutation
 
 __all__ = [
     "FileMutation",
-]
\ No newline at end of file
+    "UploadSessionMutation",
+]
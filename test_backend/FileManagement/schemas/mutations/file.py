@@ -1,10 +1,12 @@
 import graphene
+from collections import Counter
 
 
-from test_backend.FileManagement.models import File
+from test_backend.FileManagement.models import Blob, File, FileChange, FileJob
 from test_backend.base.schemas import (
     TestMutation,
-    TestDeleteMutation
+    TestDeleteMutation,
+    TestBatchCreateMutation,
 )
 
 
@@ -26,6 +28,43 @@ class FileUpdateMutation(TestMutation):
         mutation_create = False
 
 
+class FileBatchCreateMutation(TestBatchCreateMutation):
+    """
+    Creates many files at once, each item has the arguments of createFile.
+    """
+    class Meta:
+        model_class = File
+
+    @classmethod
+    def before_bulk_create(cls, instances):
+        # bulk_create doesn't call save, store the contents here
+        for instance in instances:
+            instance.commit_file()
+
+    @classmethod
+    def after_bulk_create(cls, instances):
+        references = Counter(instance.sha256 for instance in instances if instance.sha256)
+        stored = {instance.sha256: instance for instance in instances if instance.sha256}
+        for digest, count in references.items():
+            instance = stored[digest]
+            name = Blob.objects.acquire(
+                digest,
+                instance.file.name,
+                instance.file.size if instance.size is None else instance.size,
+                count=count,
+                content=getattr(instance, "stored_content", None),
+            )
+            if name != instance.file.name:
+                # the blob is stored with other fan-out settings
+                same_content = [item for item in instances if item.sha256 == digest]
+                File.objects.filter(pk__in=[item.pk for item in same_content]).update(file=name)
+                for item in same_content:
+                    item.file.name = name
+
+        FileJob.objects.enqueue(instances)
+        FileChange.objects.record(FileChange.CREATED, [instance.pk for instance in instances])
+
+
 class FileDeleteMutation(TestDeleteMutation):
     """
     Deletes a user with the given id.
@@ -36,5 +75,6 @@ class FileDeleteMutation(TestDeleteMutation):
 
 class Mutation(graphene.ObjectType):
     create_file = FileCreateMutation.Field()
+    create_files = FileBatchCreateMutation.Field()
     update_file = FileUpdateMutation.Field()
     delete_file = FileDeleteMutation.Field()
\ No newline at end of file
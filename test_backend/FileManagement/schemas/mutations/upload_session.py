@@ -0,0 +1,161 @@
+import os
+
+import graphene
+from django.core.exceptions import ValidationError
+from django.core.files import File as DjangoFile
+from django.db import transaction
+from graphene_file_upload.scalars import Upload
+from graphene_django.forms.mutation import ErrorType, _set_errors_flag_to_context
+
+from test_backend.FileManagement.models import File, UploadSession
+from test_backend.FileManagement.schemas.queries.file import FileType
+from test_backend.FileManagement.schemas.queries.upload_session import (
+    UploadSessionType,
+    get_user_upload_sessions,
+)
+from test_backend.base.schemas import (
+    TestMutation,
+    check_auth,
+)
+from test_backend.base.schemas.mutations import create_dynamic_form
+
+
+class SessionDataFile(DjangoFile):
+    """
+    Assembled data of an upload session, linked into the storage like a
+    temporary upload instead of copied.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def finalize_upload_session(session):
+    """
+    Creates the File for a complete upload session, moving the assembled
+    data into the storage. Returns the file and form errors, the file of
+    the session if it was already finalized.
+    """
+    data = {
+        "name": session.name,
+        "mime_type": session.mime_type,
+        "file_metadata": session.file_metadata,
+    }
+    form_class = create_dynamic_form(File, {**data, "file": None})
+
+    moved = False
+    try:
+        # lock the row so concurrent finalizes create a single file
+        with transaction.atomic():
+            locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+            if locked.file_id:
+                return locked.file, {}
+            if not locked.is_complete:
+                missing = ", ".join(str(index) for index in locked.missing_chunks)
+                return None, {"session_id": [f"Missing chunks: {missing}"]}
+
+            # the storage hard links the data, a chunk sent again must not
+            # write into the stored blob
+            os.replace(session.data_path, session.finalize_path)
+            moved = True
+            with open(session.finalize_path, "rb") as data_file:
+                form = form_class(data, {"file": SessionDataFile(data_file, name=session.name)})
+                if not form.is_valid():
+                    # nothing was linked yet, the session can still be used
+                    os.replace(session.finalize_path, session.data_path)
+                    return None, form.errors
+                instance = form.save()
+
+            locked.file = instance
+            locked.save(update_fields=["file", "updated_at"])
+    except Exception:
+        if moved:
+            # the data may be linked already, the chunks are sent again
+            session.discard_data()
+            session.received_chunks = []
+            session.save(update_fields=["received_chunks", "updated_at"])
+        raise
+
+    session.file = instance
+    session.discard_data()
+
+    return instance, {}
+
+
+class UploadSessionCreateMutation(TestMutation):
+    """
+    Starts a resumable upload session for a file.
+    """
+    class Meta:
+        model_class = UploadSession
+        exclude_fields = (
+            "received_chunks",
+            "user",
+            "file",
+        )
+
+    @classmethod
+    def perform_mutate(cls, form, info):
+        # the session belongs to the user that started it
+        instance = form.save(commit=False)
+        instance.user = info.context.user
+        instance.save()
+
+        return cls(errors=[], **instance.to_dict(fields=cls._meta.fields.keys()))
+
+
+class UploadChunkMutation(graphene.Mutation):
+    """
+    Stores a chunk of an upload session. Chunks can be sent in any
+    order and re-sending an already stored chunk is harmless.
+    """
+    class Arguments:
+        session_id = graphene.ID(required=True)
+        index = graphene.Int(required=True)
+        chunk = Upload(required=True)
+
+    upload_session = graphene.Field(UploadSessionType)
+    errors = graphene.List(ErrorType)
+
+    @classmethod
+    def mutate(cls, root, info, session_id, index, chunk):
+        check_auth(info)
+
+        session = get_user_upload_sessions(info.context.user).get(pk=session_id)
+        try:
+            session.write_chunk(index, chunk.chunks())
+        except ValidationError as e:
+            _set_errors_flag_to_context(info)
+            return cls(errors=ErrorType.from_errors(e.message_dict), upload_session=session)
+
+        return cls(errors=[], upload_session=session)
+
+
+class UploadSessionFinalizeMutation(graphene.Mutation):
+    """
+    Creates the file of a complete upload session. Finalizing an already
+    finalized session returns the same file.
+    """
+    class Arguments:
+        session_id = graphene.ID(required=True)
+
+    file = graphene.Field(FileType)
+    errors = graphene.List(ErrorType)
+
+    @classmethod
+    def mutate(cls, root, info, session_id):
+        check_auth(info)
+
+        session = get_user_upload_sessions(info.context.user).get(pk=session_id)
+        instance, errors = finalize_upload_session(session)
+        if errors:
+            _set_errors_flag_to_context(info)
+            return cls(errors=ErrorType.from_errors(errors))
+
+        return cls(errors=[], file=instance)
+
+
+class Mutation(graphene.ObjectType):
+    start_upload_session = UploadSessionCreateMutation.Field()
+    upload_chunk = UploadChunkMutation.Field()
+    finalize_upload_session = UploadSessionFinalizeMutation.Field()
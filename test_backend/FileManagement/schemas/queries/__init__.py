@@ -1,6 +1,10 @@
 from .file import Query as FileQuery
+from .file_change import Query as FileChangeQuery
+from .upload_session import Query as UploadSessionQuery
 
 
 __all__ = [
     "FileQuery",
-]
\ No newline at end of file
+    "FileChangeQuery",
+    "UploadSessionQuery",
+]
@@ -1,37 +1,77 @@
-import os
 import graphene
 from graphene_django import DjangoObjectType
-from django.db.models import Q
 
-from test_backend.FileManagement.models import File
+from test_backend.FileManagement.downloads import get_base_url, signed_download_path
+from test_backend.FileManagement.models import File, FileJob
+from test_backend.FileManagement.models.file import file_search_vector
 
 from test_backend.base.schemas.custom_scalars import JSONObject
+from test_backend.base.schemas.loaders import load_by_lookup
+from test_backend.base.schemas.rows import RowTypeMixin
+from test_backend.base.schemas.search import create_field_enum
 from test_backend.base.schemas import (
     resolve_with_pagination,
     check_auth,
     PageInfoType,
+    CountModeEnum,
+    resolve_facets,
+    DateBucketEnum,
+    FacetsType,
+    SearchModeEnum,
+    TextSearch,
     FilterTypeInput,
     SortTypeInput,
 )
 
 
-class FileType(DjangoObjectType):
+class FileJobType(DjangoObjectType):
     """
-    Default type for Files.
+    Default type for the post-processing jobs of a file.
+    """
+    result = JSONObject()
+
+    class Meta:
+        model = FileJob
+        exclude = ("locked_by",)
+
+
+class FileType(RowTypeMixin, DjangoObjectType):
+    """
+    Default type for Files, resolved from model instances or rows.
     """
     file_metadata = JSONObject()
 
     file = graphene.String()
 
+    processing_status = graphene.String(
+        description="Status of the post-processing jobs: pending, running, done or failed"
+    )
+
+    # model fields read by the resolvers, see get_only_fields
+    field_dependencies = {
+        "file": ("file", "name", "mime_type"),
+        "processing_status": ("jobs",),
+    }
+
     class Meta:
         model = File
         fields = "__all__"
 
     def resolve_file(self, info):
-        return "http://localhost:" + os.environ.get("TEST_APP_PORT", "7070") + self.file.url
+        return get_base_url(info.context) + signed_download_path(self)
+
+    def resolve_processing_status(self, info):
+        statuses = {job.status for job in self.jobs.all()}
+        for status in (FileJob.FAILED, FileJob.RUNNING, FileJob.PENDING):
+            if status in statuses:
+                return status
+        return FileJob.DONE if statuses else None
         
 
 
+file_search = TextSearch(("name",), search_vector=file_search_vector)
+
+
 class PaginatedFileType(graphene.ObjectType):
     """
     A type to return a paginated result for Files.
@@ -51,6 +91,7 @@ class Query(graphene.ObjectType):
         FileType,
         id=graphene.ID(),
         name=graphene.String(),
+        sha256=graphene.String(),
     )
 
     all_files = graphene.Field(
@@ -60,27 +101,61 @@ class Query(graphene.ObjectType):
         sort=graphene.List(FileSortTypeInput),
         page_size=graphene.Int(),
         page=graphene.Int(),
+        after=graphene.String(description="Returns the items after this cursor, instead of a page"),
+        before=graphene.String(description="Returns the items before this cursor, instead of a page"),
+        count_mode=graphene.Argument(CountModeEnum, description="How totalCount is computed, exact by default"),
+        search_mode=graphene.Argument(SearchModeEnum, description="How search is matched, contains by default"),
     )
 
-    def resolve_file(self, info, id=None, name=None):
+    file_facets = graphene.Field(
+        FacetsType,
+        search=graphene.String(),
+        filters=graphene.Argument(FileFilterTypeInput),
+        fields=graphene.List(lambda: create_field_enum(File), description="Fields to count the values of"),
+        keys=graphene.List(graphene.String, description="Keys of fileMetadata to count the values of, dot separated for nested keys"),
+        date_bucket=graphene.Argument(DateBucketEnum, description="Counts the files created in each day, week, month or year"),
+        limit=graphene.Int(description="Number of values counted for each field and key, the most common ones, 10 by default"),
+        search_mode=graphene.Argument(SearchModeEnum, description="How search is matched, contains by default"),
+    )
+
+    def resolve_file(self, info, id=None, name=None, sha256=None):
         check_auth(info)
 
-        if id:
-            return File.objects.get(pk=id)
-        
-        if name:
-            return File.objects.get(name=name)
+        # all the file fields of the query are loaded at once
+        file = load_by_lookup(
+            info, FileType, {"id": "pk", "name": "name", "sha256": "sha256"},
+            id=id, name=name, sha256=sha256,
+        )
+        if file is None and (id or name):
+            raise File.DoesNotExist("File matching query does not exist.")
 
+        return file
 
-    def resolve_all_files(self, info, search=None, filters=None, sort=None, page_size=10, page=1):
+
+    def resolve_all_files(self, info, search=None, filters=None, sort=None, page_size=10, page=1, after=None, before=None, count_mode=None, search_mode=None):
         return resolve_with_pagination(
             File,
             info,
-            (Q(name__icontains=search))
-            if search
-            else None,
+            file_search(search, search_mode) if search else None,
             filters,
             sort,
             page_size,
             page,
-        )
\ No newline at end of file
+            after,
+            before,
+            count_mode,
+        )
+
+    def resolve_file_facets(self, info, search=None, filters=None, fields=None, keys=None, date_bucket=None, limit=10, search_mode=None):
+        return resolve_facets(
+            File,
+            info,
+            file_search(search, search_mode) if search else None,
+            filters,
+            fields,
+            keys,
+            date_bucket,
+            limit,
+            json_field="file_metadata",
+            date_field="created_at",
+        )
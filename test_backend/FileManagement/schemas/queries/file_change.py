@@ -0,0 +1,101 @@
+import base64
+
+import graphene
+from django.conf import settings
+from graphene_django import DjangoObjectType
+from graphql import GraphQLError
+
+from test_backend.FileManagement.models import File, FileChange
+from test_backend.FileManagement.schemas.queries.file import FileType
+
+from test_backend.base.schemas import check_auth
+from test_backend.base.schemas.loaders import ModelLoader, get_loaders
+from test_backend.base.schemas.selection import get_selection, optimize_queryset
+
+
+def encode_change_cursor(change_id):
+    return base64.urlsafe_b64encode(f"change:{change_id}".encode()).decode()
+
+
+def decode_change_cursor(cursor):
+    try:
+        prefix, change_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "change":
+            raise ValueError(prefix)
+        return int(change_id)
+    except (ValueError, TypeError):
+        raise GraphQLError("Invalid cursor")
+
+
+class FileChangeType(DjangoObjectType):
+    """
+    Default type for the changes of the files.
+    """
+
+    cursor = graphene.String(description="Cursor of the change, to use in since")
+
+    file = graphene.Field(
+        FileType, description="The file as it is now, null if it has been deleted"
+    )
+
+    class Meta:
+        model = FileChange
+        fields = ("action", "file_id", "created_at")
+
+    def resolve_cursor(self, info):
+        return encode_change_cursor(self.pk)
+
+    def resolve_file(self, info):
+        if self.action == FileChange.DELETED:
+            return None
+        return get_loaders(info)[("FileChangeType", "file")].load(self.file_id)
+
+
+class FileChangesType(graphene.ObjectType):
+    """
+    A type to return the changes of the files after a cursor.
+    """
+
+    changes = graphene.List(FileChangeType)
+    cursor = graphene.String(description="Cursor of the last change, to use in since next time")
+    has_more = graphene.Boolean(description="Whether there are more changes after these")
+
+
+class Query(graphene.ObjectType):
+    file_changes = graphene.Field(
+        FileChangesType,
+        since=graphene.String(description="Returns the changes after this cursor, all of them if not given"),
+        page_size=graphene.Int(description="Maximum number of changes returned, 100 by default"),
+    )
+
+    def resolve_file_changes(self, info, since=None, page_size=100):
+        check_auth(info)
+
+        if not page_size or not 1 <= page_size <= settings.PAGINATION_MAX_PAGE_SIZE:
+            raise GraphQLError(
+                "pageSize must be between 1 and %s" % settings.PAGINATION_MAX_PAGE_SIZE
+            )
+
+        queryset = FileChange.objects.order_by("pk")
+        if since:
+            queryset = queryset.filter(pk__gt=decode_change_cursor(since))
+
+        changes = list(queryset[: page_size + 1])
+        has_more = len(changes) > page_size
+        changes = changes[:page_size]
+
+        # the files of all the changes are loaded at once, with only the
+        # selected columns
+        file_selection = get_selection(info).get("changes", {}).get("file")
+        if file_selection is not None:
+            loader = ModelLoader(optimize_queryset(File.objects.all(), FileType, file_selection))
+            for change in changes:
+                if change.action != FileChange.DELETED:
+                    loader.prepare(change.file_id)
+            get_loaders(info)[("FileChangeType", "file")] = loader
+
+        return FileChangesType(
+            changes=changes,
+            cursor=encode_change_cursor(changes[-1].pk) if changes else since,
+            has_more=has_more,
+        )
@@ -0,0 +1,43 @@
+import graphene
+from graphene_django import DjangoObjectType
+
+from test_backend.FileManagement.models import UploadSession
+
+from test_backend.base.schemas.custom_scalars import JSONObject
+from test_backend.base.schemas import check_auth
+
+
+def get_user_upload_sessions(user):
+    """
+    Upload sessions are only visible to the user that started them.
+    """
+    return UploadSession.objects.filter(user=user)
+
+
+class UploadSessionType(DjangoObjectType):
+    """
+    Default type for upload sessions.
+    """
+    file_metadata = JSONObject()
+
+    chunk_count = graphene.Int()
+    missing_chunks = graphene.List(graphene.Int)
+    received_offsets = graphene.List(graphene.BigInt)
+    bytes_received = graphene.BigInt()
+    is_complete = graphene.Boolean()
+
+    class Meta:
+        model = UploadSession
+        fields = "__all__"
+
+
+class Query(graphene.ObjectType):
+    upload_session = graphene.Field(
+        UploadSessionType,
+        id=graphene.ID(required=True),
+    )
+
+    def resolve_upload_session(self, info, id):
+        check_auth(info)
+
+        return get_user_upload_sessions(info.context.user).get(pk=id)
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from test_backend.FileManagement.models import Blob, File, FileChange
+
+
+@receiver(post_delete, sender=File)
+def release_file_blob(sender, instance, **kwargs):
+    """
+    Drops the reference of a deleted file to its blob, queryset deletes
+    included.
+    """
+    if instance.sha256:
+        Blob.objects.release(instance.sha256)
+
+
+@receiver(post_save, sender=File)
+def record_file_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Logs the files created and updated, see FileChange.
+    """
+    if not raw:
+        FileChange.objects.record(
+            FileChange.CREATED if created else FileChange.UPDATED, [instance.pk]
+        )
+
+
+@receiver(post_delete, sender=File)
+def record_file_delete(sender, instance, **kwargs):
+    """
+    Logs the files deleted, queryset deletes included.
+    """
+    FileChange.objects.record(FileChange.DELETED, [instance.pk])
@@ -0,0 +1,100 @@
+import struct
+import wave
+
+# bytes needed to recognize every signature below
+HEAD_SIZE = 64
+
+SIGNATURES = (
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (0, b"fLaC", "audio/flac"),
+    (0, b"OggS", "audio/ogg"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"PK\x03\x04", "application/zip"),
+    (0, b"\x1f\x8b", "application/gzip"),
+    (4, b"ftyp", "video/mp4"),
+)
+
+RIFF_TYPES = {
+    b"WAVE": "audio/wav",
+    b"AVI ": "video/x-msvideo",
+    b"WEBP": "image/webp",
+}
+
+
+def sniff_mime_type(head):
+    """
+    Detects the MIME type of a content from its first bytes, returns
+    None when it's not recognized.
+    """
+    if head[:4] == b"RIFF":
+        return RIFF_TYPES.get(head[8:12])
+
+    for offset, signature, mime_type in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return mime_type
+
+    # MPEG audio frame sync without ID3 tag
+    if len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        return "audio/mpeg"
+
+    return None
+
+
+def wav_info(file):
+    with wave.open(file, "rb") as wav:
+        frames = wav.getnframes()
+        rate = wav.getframerate()
+        return {
+            "Duration": round(frames / rate, 3) if rate else None,
+            "SampleRate": rate,
+            "Channels": wav.getnchannels(),
+            "BitsPerSample": wav.getsampwidth() * 8,
+        }
+
+
+def png_info(file):
+    head = file.read(24)
+    width, height = struct.unpack(">II", head[16:24])
+    return {"Width": width, "Height": height}
+
+
+def jpeg_info(file):
+    file.read(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return {}
+        length = struct.unpack(">H", file.read(2))[0]
+        # start of frame markers, except DHT, JPG and DAC
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", file.read(5))
+            return {"Width": width, "Height": height}
+        file.seek(length - 2, 1)
+
+
+MEDIA_INFO_READERS = {
+    "audio/wav": wav_info,
+    "image/png": png_info,
+    "image/jpeg": jpeg_info,
+}
+
+
+def media_info(file, mime_type):
+    """
+    Reads the technical metadata (duration, dimensions...) of the
+    content, reading only its headers.
+    """
+    reader = MEDIA_INFO_READERS.get(mime_type)
+    if reader is None:
+        return {}
+
+    try:
+        return reader(file)
+    except (wave.Error, struct.error, EOFError):
+        return {}
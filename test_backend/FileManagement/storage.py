@@ -0,0 +1,174 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@deconstructible
+class ContentAddressableStorage(FileSystemStorage):
+    """
+    File system storage that keeps each distinct content once, under the
+    SHA-256 digest of its bytes. The digest is computed while the content
+    is written, so uploads are read a single time. Uploads already on
+    disk are hard linked into place instead of copied.
+
+    Blobs are spread in nested directories named after the first
+    characters of their digest, <upload_to>/<aa>/<bb>/<digest> with the
+    default FILE_STORAGE_FANOUT_DEPTH and FILE_STORAGE_FANOUT_WIDTH.
+    """
+
+    incoming_dir = ".incoming"
+    hash_block_size = 1024 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # names are given by the content, an existing name is the same blob
+        return name
+
+    def blob_name(self, directory, digest):
+        width = settings.FILE_STORAGE_FANOUT_WIDTH
+        prefixes = [
+            digest[level * width : (level + 1) * width]
+            for level in range(settings.FILE_STORAGE_FANOUT_DEPTH)
+        ]
+        return os.path.join(directory, *prefixes, digest).replace("\\", "/")
+
+    def blob_name_regex(self, directory):
+        """
+        Returns a regular expression matching the names of the blobs
+        stored in the current layout.
+        """
+        width = settings.FILE_STORAGE_FANOUT_WIDTH
+        depth = settings.FILE_STORAGE_FANOUT_DEPTH
+        prefixes = f"([0-9a-f]{{{width}}}/){{{depth}}}" if depth else ""
+        return f"^{re.escape(directory.rstrip('/'))}/{prefixes}[0-9a-f]{{64}}$"
+
+    @staticmethod
+    def digest(name):
+        """
+        Returns the digest of a blob name, or None if the name was not
+        given by this storage.
+        """
+        basename = os.path.basename(name or "")
+        return basename if DIGEST_RE.match(basename) else None
+
+    def file_digest(self, path):
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(self.hash_block_size), b""):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def link(self, path, name):
+        """
+        Hard links a file of the storage, or any file in its filesystem,
+        to a blob name. Does nothing if the blob already exists.
+        """
+        full_path = self.path(name)
+        self._make_directory(os.path.dirname(full_path))
+        try:
+            os.link(path, full_path)
+        except FileExistsError:
+            # same content already stored
+            return
+
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+    def restore(self, name, content):
+        """
+        Writes a content at its blob name again, after it was deleted.
+        """
+        incoming = self.path(self.incoming_dir)
+        os.makedirs(incoming, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                for chunk in content.chunks():
+                    tmp_file.write(chunk)
+            self._commit(tmp_path, self.path(name))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+
+        # digest computed while the upload was received
+        digest = getattr(content, "sha256", None)
+        if digest and self.exists(self.blob_name(directory, digest)):
+            # same content already stored, nothing to write
+            return self.blob_name(directory, digest)
+
+        if hasattr(content, "temporary_file_path"):
+            linked = self._link_temporary(directory, content, digest)
+            if linked:
+                return linked
+
+        incoming = self.path(self.incoming_dir)
+        os.makedirs(incoming, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            sha256 = hashlib.sha256()
+            with os.fdopen(fd, "wb") as tmp_file:
+                for chunk in content.chunks():
+                    sha256.update(chunk)
+                    tmp_file.write(chunk)
+
+            name = self.blob_name(directory, sha256.hexdigest())
+            self._commit(tmp_path, self.path(name))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return name
+
+    def _link_temporary(self, directory, content, digest):
+        """
+        Stores a content already on disk, like a temporary upload, with a
+        hard link instead of copying its bytes. Returns None when the link
+        can't be made, e.g. the file is in another filesystem.
+        """
+        content.flush()
+        tmp_path = content.temporary_file_path()
+        if digest is None:
+            digest = self.file_digest(tmp_path)
+
+        name = self.blob_name(directory, digest)
+        try:
+            self.link(tmp_path, name)
+        except OSError:
+            return None
+        return name
+
+    def _commit(self, tmp_path, full_path):
+        if os.path.exists(full_path):
+            # same content already stored, drop the new copy
+            return
+
+        self._make_directory(os.path.dirname(full_path))
+        os.replace(tmp_path, full_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+    def _make_directory(self, directory):
+        if self.directory_permissions_mode is not None:
+            # Set the umask because os.makedirs() doesn't apply the "mode"
+            # argument to intermediate-level directories.
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+
+blob_storage = ContentAddressableStorage()
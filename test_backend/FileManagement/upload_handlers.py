@@ -0,0 +1,83 @@
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+from test_backend.FileManagement.sniffing import HEAD_SIZE, sniff_mime_type
+
+
+class ChecksumUploadHandler(FileUploadHandler):
+    """
+    Upload handler that computes the SHA-256, the size and the MIME type
+    of each file while it's received, so the content never has to be
+    read again for them.
+
+    Files are kept in memory up to FILE_UPLOAD_MAX_MEMORY_SIZE bytes and
+    spooled to a temporary file past it. A file bigger than
+    FILE_UPLOAD_MAX_SIZE stops the upload as soon as the limit is
+    crossed, without reading the rest of the request.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.head = b""
+        self.buffer = BytesIO()
+        self.spool = None
+
+    def receive_data_chunk(self, raw_data, start):
+        received = start + len(raw_data)
+        if received > settings.FILE_UPLOAD_MAX_SIZE:
+            self.reject()
+
+        self.sha256.update(raw_data)
+        if len(self.head) < HEAD_SIZE:
+            self.head += raw_data[: HEAD_SIZE - len(self.head)]
+
+        if self.spool is None and received > settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            if settings.FILE_UPLOAD_TEMP_DIR:
+                os.makedirs(settings.FILE_UPLOAD_TEMP_DIR, exist_ok=True)
+            self.spool = TemporaryUploadedFile(
+                self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+            )
+            self.spool.write(self.buffer.getvalue())
+            self.buffer = None
+
+        (self.spool or self.buffer).write(raw_data)
+
+        # the data is handled here, the next handlers don't receive it
+        return None
+
+    def file_complete(self, file_size):
+        if self.spool is None:
+            self.buffer.seek(0)
+            uploaded = InMemoryUploadedFile(
+                file=self.buffer,
+                field_name=self.field_name,
+                name=self.file_name,
+                content_type=self.content_type,
+                size=file_size,
+                charset=self.charset,
+                content_type_extra=self.content_type_extra,
+            )
+        else:
+            self.spool.seek(0)
+            self.spool.size = file_size
+            uploaded = self.spool
+
+        uploaded.sha256 = self.sha256.hexdigest()
+        uploaded.detected_content_type = sniff_mime_type(self.head)
+        return uploaded
+
+    def upload_interrupted(self):
+        if self.spool is not None:
+            # closing a temporary uploaded file deletes it
+            self.spool.close()
+
+    def reject(self):
+        self.request.rejected_upload = self.file_name
+        self.upload_interrupted()
+        raise StopUpload(connection_reset=True)
@@ -0,0 +1,26 @@
+from django.urls import path
+
+from test_backend.FileManagement import views
+
+urlpatterns = [
+    path(
+        "export/",
+        views.FileExportView.as_view(),
+        name="file-export",
+    ),
+    path(
+        "download/<path:name>",
+        views.FileDownloadView.as_view(),
+        name="file-download",
+    ),
+    path(
+        "upload-sessions/<uuid:pk>/",
+        views.UploadSessionView.as_view(),
+        name="upload-session",
+    ),
+    path(
+        "upload-sessions/<uuid:pk>/chunks/<int:index>/",
+        views.UploadChunkView.as_view(),
+        name="upload-session-chunk",
+    ),
+]
@@ -0,0 +1,220 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import FieldError, ValidationError
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotFound,
+    HttpResponseNotModified,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils.http import parse_etags
+from django.views.generic import View
+from graphql import GraphQLError
+
+from test_backend.FileManagement.downloads import (
+    content_disposition,
+    iter_range,
+    parse_range,
+    verify_download,
+)
+from test_backend.FileManagement.exports import EXPORT_FORMATS, get_export_queryset, iter_export
+from test_backend.FileManagement.models import UploadSession
+from test_backend.FileManagement.schemas.queries.upload_session import get_user_upload_sessions
+from test_backend.FileManagement.storage import blob_storage
+from test_backend.base.views import AuthenticatedView, error_response
+
+# bytes read from the request body at a time when storing a chunk
+READ_SIZE = 64 * 1024
+
+
+def upload_session_status(session):
+    return {
+        "id": str(session.pk),
+        "totalSize": session.total_size,
+        "chunkSize": session.chunk_size,
+        "chunkCount": session.chunk_count,
+        "receivedChunks": session.received_chunks,
+        "receivedOffsets": session.received_offsets,
+        "missingChunks": session.missing_chunks,
+        "bytesReceived": session.bytes_received,
+        "file": str(session.file_id) if session.file_id else None,
+    }
+
+
+class UploadSessionView(AuthenticatedView):
+    """
+    Returns the chunks and offsets already stored for an upload session.
+    """
+
+    def get(self, request, pk):
+        try:
+            session = get_user_upload_sessions(request.user).get(pk=pk)
+        except UploadSession.DoesNotExist:
+            return error_response("Upload session not found", status=404)
+
+        return JsonResponse(upload_session_status(session))
+
+
+class UploadChunkView(AuthenticatedView):
+    """
+    Stores a chunk of an upload session sent as the raw request body,
+    an alternative to the uploadChunk mutation without multipart encoding.
+    """
+
+    http_method_names = ["put", "post"]
+
+    def put(self, request, pk, index):
+        try:
+            session = get_user_upload_sessions(request.user).get(pk=pk)
+        except UploadSession.DoesNotExist:
+            return error_response("Upload session not found", status=404)
+
+        try:
+            session.write_chunk(index, iter(lambda: request.read(READ_SIZE), b""))
+        except ValidationError as e:
+            field, messages = next(iter(e.message_dict.items()))
+            return error_response(messages[0], field=field)
+
+        return JsonResponse(upload_session_status(session))
+
+    post = put
+
+
+class FileExportView(AuthenticatedView):
+    """
+    Streams the files matching the filters of allFiles, as JSON lines
+    (format=ndjson, the default) or CSV (format=csv), in a single response.
+
+    The params are the search, searchMode, filters and sort arguments of
+    allFiles as JSON, and the comma separated fields to export, in the
+    query string, or in a JSON body with POST.
+    """
+
+    http_method_names = ["get", "post"]
+
+    def get(self, request):
+        params = {}
+        for key, value in request.GET.items():
+            if key in ("filters", "sort"):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    return error_response(f"{key} must be JSON", field=key)
+            params[key] = value
+        return self.export(params)
+
+    def post(self, request):
+        try:
+            params = json.loads(request.body or b"{}")
+        except ValueError:
+            return error_response("The body must be a JSON object")
+        if not isinstance(params, dict):
+            return error_response("The body must be a JSON object")
+        return self.export(params)
+
+    def export(self, params):
+        export_format = params.get("format") or "ndjson"
+        if export_format not in EXPORT_FORMATS:
+            return error_response(
+                "format must be one of %s" % ", ".join(EXPORT_FORMATS), field="format"
+            )
+
+        try:
+            queryset, fields = get_export_queryset(params)
+        except GraphQLError as e:
+            return error_response(e.message)
+        except ValidationError as e:
+            # the filter values are prepared when the queryset is built
+            return error_response(e.messages[0])
+        except FieldError as e:
+            return error_response(str(e))
+
+        response = StreamingHttpResponse(
+            iter_export(queryset, fields, export_format),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="files.{export_format}"'
+        return response
+
+
+class FileDownloadView(View):
+    """
+    Serves the content of a file from a signed URL (see FileType.file),
+    with support for conditional and range requests. When a web server is
+    in front, the transfer is handed to it with X-Accel-Redirect or
+    X-Sendfile.
+    """
+
+    http_method_names = ["get", "head"]
+
+    def get(self, request, name):
+        signed = verify_download(name, request.GET)
+        if signed is None:
+            return HttpResponseForbidden("Invalid or expired URL")
+        filename, content_type = signed
+
+        try:
+            stat = os.stat(blob_storage.path(name))
+        except (FileNotFoundError, NotADirectoryError):
+            return HttpResponseNotFound("File not found")
+
+        # blobs are named after their digest, which is a strong etag
+        digest = blob_storage.digest(name)
+        etag = f'"{digest}"' if digest else f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+            response = HttpResponseNotModified()
+            self.set_headers(response, request, etag, filename, content_type)
+            return response
+
+        accel = settings.MEDIA_ACCEL_REDIRECT
+        if accel:
+            # the web server sends the content, ranges included
+            response = HttpResponse(content_type=content_type or None)
+            if accel == "x-accel-redirect":
+                response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + name
+            else:
+                response["X-Sendfile"] = blob_storage.path(name)
+            self.set_headers(response, request, etag, filename, content_type)
+            return response
+
+        byte_range = None
+        range_header = request.headers.get("Range")
+        if_range = request.headers.get("If-Range")
+        if range_header and (not if_range or if_range.strip() == etag):
+            byte_range = parse_range(range_header, stat.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+        content = blob_storage.open(name, "rb")
+        if byte_range is None:
+            response = FileResponse(content, content_type=content_type or None)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                iter_range(content, start, length), status=206, content_type=content_type or None
+            )
+            response["Content-Length"] = str(length)
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+        self.set_headers(response, request, etag, filename, content_type)
+        return response
+
+    def set_headers(self, response, request, etag, filename, content_type):
+        response["ETag"] = etag
+        response["Accept-Ranges"] = "bytes"
+        expires_in = max(0, int(request.GET["expires"]) - int(time.time()))
+        response["Cache-Control"] = f"private, max-age={expires_in}"
+        if filename:
+            response["Content-Disposition"] = content_disposition(filename)
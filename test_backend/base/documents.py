@@ -0,0 +1,122 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    parse,
+    validate,
+)
+
+from test_backend.base.lru import LRUCache
+
+# parsed and validated documents, by the SHA-256 of their query
+document_cache = LRUCache(settings.DOCUMENT_CACHE_SIZE)
+# queries seen once, they are kept in document_cache the second time
+seen_queries = LRUCache(settings.DOCUMENT_CACHE_SIZE)
+
+persisted_queries = caches["results"]
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def get_document(schema, query):
+    """
+    Returns the parsed document of a query and its validation errors.
+
+    Valid documents are kept in memory, so the same query is parsed and
+    validated once per process. A query is only kept once it has been
+    seen twice, and long queries are never kept, so one-off queries don't
+    evict the frequent ones.
+    """
+    key = query_hash(query)
+    document = document_cache.get(key)
+    if document is not None:
+        return document, []
+
+    try:
+        document = parse(query)
+    except GraphQLError as e:
+        return None, [e]
+
+    errors = validate(schema, document)
+    if not errors and len(query) <= settings.DOCUMENT_CACHE_MAX_QUERY_SIZE:
+        if seen_queries.get(key):
+            document_cache.set(key, document)
+        else:
+            seen_queries.set(key, True)
+    return document, errors
+
+
+def get_extensions(request, data):
+    extensions = request.GET.get("extensions") or data.get("extensions") or {}
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise GraphQLError("Extensions must be a JSON object")
+    return extensions if isinstance(extensions, dict) else {}
+
+
+def get_persisted_query(query, extensions):
+    """
+    Automatic persisted queries: clients send the SHA-256 hash of the query
+    in extensions.persistedQuery.sha256Hash, with the query the first time
+    to store it, and only the hash afterwards. Returns the query to run.
+    """
+    persisted_query = extensions.get("persistedQuery")
+    if not isinstance(persisted_query, dict):
+        return query
+
+    if persisted_query.get("version") != 1:
+        raise GraphQLError(
+            "Unsupported persisted query version",
+            extensions={"code": "PERSISTED_QUERY_NOT_SUPPORTED"},
+        )
+
+    digest = str(persisted_query.get("sha256Hash", "")).lower()
+    key = f"persisted-query:{digest}"
+    if not query:
+        query = persisted_queries.get(key)
+        if query is None:
+            raise GraphQLError(
+                "PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"}
+            )
+        return query
+
+    if query_hash(query) != digest:
+        raise GraphQLError("The sha256Hash of the persisted query does not match the query")
+    persisted_queries.set(key, query, None)
+    return query
+
+
+def get_fragments(document):
+    return {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+
+
+def iter_field_nodes(selection_set, fragments, visited=frozenset()):
+    """
+    Yields the field nodes of a selection set of a document, with the
+    fields of its fragments, without resolving directives or merging the
+    fields selected several times. For the checks made before execution.
+    """
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from iter_field_nodes(selection.selection_set, fragments, visited)
+        elif isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            if name in fragments and name not in visited:
+                yield from iter_field_nodes(fragments[name].selection_set, fragments, visited | {name})
@@ -0,0 +1,71 @@
+import json
+
+from django.db.models import CharField, F, Field, Func, JSONField, Lookup
+from django.db.models.fields.json import KeyTransform
+
+
+@JSONField.register_lookup
+class JSONPathExists(Lookup):
+    """
+    Checks that a path of keys exists in a JSON field. Uses the @? jsonpath
+    operator, which can use jsonb_path_ops GIN indexes.
+
+        File.objects.filter(file_metadata__path_exists=["device", "id"])
+    """
+
+    lookup_name = "path_exists"
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        path = "$" + "".join("." + json.dumps(str(key)) for key in self.rhs)
+        return f"{lhs} @? %s::jsonpath", [*lhs_params, path]
+
+
+@Field.register_lookup
+class AnyOf(Lookup):
+    """
+    Checks that a field is one of a list of values. On PostgreSQL the list
+    is sent as a single array parameter, = ANY(%s), so the SQL is the same
+    for any number of values.
+
+        File.objects.filter(id__any=[id1, id2])
+    """
+
+    lookup_name = "any"
+
+    def get_prep_lookup(self):
+        return [self.lhs.output_field.get_prep_value(value) for value in self.rhs]
+
+    def get_db_values(self, connection):
+        field = self.lhs.output_field
+        return [field.get_db_prep_value(value, connection, prepared=True) for value in self.rhs]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        values = self.get_db_values(connection)
+        placeholders = ", ".join(["%s"] * len(values))
+        return f"{lhs} IN ({placeholders})", [*lhs_params, *values]
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        return f"{lhs} = ANY(%s)", [*lhs_params, self.get_db_values(connection)]
+
+
+class JSONTypeOf(Func):
+    """
+    Type of a JSON value: object, array, string, number, boolean or null.
+    """
+
+    function = "jsonb_typeof"
+    output_field = CharField()
+
+
+def json_path(field_name, path):
+    """
+    Returns the expression of the value at a path of keys of a JSON field.
+    """
+    expression = F(field_name)
+    for key in path:
+        expression = KeyTransform(key, expression)
+    return expression
@@ -0,0 +1,174 @@
+import hashlib
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import F, Func, Index
+from django.db.models.expressions import Expression
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+
+# immutable functions to cast the JSON texts in generated columns, invalid
+# values become null instead of failing the insert
+CAST_FUNCTIONS = {
+    "text": None,
+    "double precision": "metadata_double",
+    "timestamptz": "metadata_timestamptz",
+}
+
+# fields of the values of JSON keys by the casts of the sorts
+KEY_CASTS = {
+    "text": models.TextField,
+    "number": models.FloatField,
+    "datetime": models.DateTimeField,
+}
+
+KEY_REGEX = re.compile(r"^[A-Za-z0-9]+(_[A-Za-z0-9]+)*$")
+
+
+class GeneratedColumn(Expression):
+    """
+    A column of the table that is not a field of the model.
+    """
+
+    def __init__(self, column, output_field):
+        super().__init__(output_field=output_field)
+        self.column = column
+
+    def as_sql(self, compiler, connection):
+        table = compiler.quote_name_unless_alias(compiler.query.base_table)
+        return f"{table}.{connection.ops.quote_name(self.column)}", []
+
+
+class MetadataColumn:
+    """
+    A key of a JSON field promoted to a stored generated column, with a
+    btree index, so filters and sorts on it are as fast as on a regular
+    column and have its statistics.
+
+    Models list them in metadata_columns. The columns are created by a
+    migration with the SQL of add_column_sql(), and are used by name in
+    filters and sorts, see with_metadata_columns().
+    """
+
+    def __init__(self, json_field, key, name, field):
+        self.json_field = json_field
+        self.key = key
+        self.name = name
+        self.field = field
+        self.field.set_attributes_from_name(name)
+        self.field.null = True
+
+    @property
+    def sql_type(self):
+        if isinstance(self.field, models.DateTimeField):
+            return "timestamptz"
+        if isinstance(self.field, (models.FloatField, models.IntegerField)):
+            return "double precision"
+        return "text"
+
+    def expression(self):
+        return GeneratedColumn(self.name, self.field)
+
+    def add_column_sql(self, table):
+        value = f"\"{self.json_field}\" ->> '{self.key}'"
+        cast = CAST_FUNCTIONS[self.sql_type]
+        if cast:
+            value = f"{cast}({value})"
+
+        return [
+            f'ALTER TABLE "{table}" ADD COLUMN "{self.name}" {self.sql_type} '
+            f"GENERATED ALWAYS AS ({value}) STORED",
+            f'CREATE INDEX "{table.lower()}_{self.name}" ON "{table}" ("{self.name}")',
+        ]
+
+    def remove_column_sql(self, table):
+        return [f'ALTER TABLE "{table}" DROP COLUMN "{self.name}"']
+
+
+class MetadataKey(MetadataColumn):
+    """
+    A key of a JSON field without a column, cast in the queries. Its name
+    is "[json field]__[key]__[cast]", with a key for each level of nested
+    keys, e.g. file_metadata__recorded_at__datetime. Sorts on it can be
+    served by an expression index, see the create_metadata_indexes command.
+    """
+
+    def __init__(self, json_field, path, cast):
+        self.path = list(path)
+        self.cast = cast
+        name = "__".join([json_field, *self.path, cast])
+        super().__init__(json_field, self.path[0], name, KEY_CASTS[cast]())
+
+    def expression(self):
+        value = F(self.json_field)
+        for key in self.path[:-1]:
+            value = KeyTransform(key, value)
+        value = KeyTextTransform(self.path[-1], value)
+
+        cast = CAST_FUNCTIONS[self.sql_type]
+        return Func(value, function=cast, output_field=self.field) if cast else value
+
+    def index(self, model):
+        """
+        Returns the index of the key for the sorts, with the pk to break ties.
+        """
+        name = "%s_%s_sort" % (model._meta.db_table.lower(), "_".join([*self.path, self.cast]))
+        if len(name) > 63:
+            name = name[:54] + "_" + hashlib.md5(self.name.encode()).hexdigest()[:8]
+        return Index(self.expression(), F("pk"), name=name)
+
+
+def parse_metadata_key(model, name):
+    """
+    Returns the MetadataKey of a name, or the metadata column with the same
+    key and type, or None if the name is not a valid key of a JSON field.
+    """
+    json_field, *path, cast = name.split("__") if "__" in name else (name, "")
+    if not path or cast not in KEY_CASTS or not all(KEY_REGEX.match(key) for key in path):
+        return None
+
+    try:
+        field = model._meta.get_field(json_field)
+    except FieldDoesNotExist:
+        return None
+    if not isinstance(field, models.JSONField):
+        return None
+
+    key = MetadataKey(json_field, path, cast)
+    for column in getattr(model, "metadata_columns", ()):
+        if (column.json_field, [column.key], column.sql_type) == (json_field, path, key.sql_type):
+            return column
+    return key
+
+
+def get_metadata_columns(model):
+    return {column.name: column for column in getattr(model, "metadata_columns", ())}
+
+
+def get_metadata_column(model, key_or_name, json_field=None):
+    """
+    Returns the metadata column with the name, or of the key of a JSON
+    field, if there is one.
+    """
+    for column in getattr(model, "metadata_columns", ()):
+        if column.name == key_or_name:
+            return column
+        if json_field and column.json_field == json_field and column.key == key_or_name:
+            return column
+    return None if json_field else parse_metadata_key(model, key_or_name)
+
+
+def with_metadata_columns(queryset, selected=()):
+    """
+    Adds the metadata columns of the model to a queryset, to use them by
+    name in filters and sorts. The selected ones are loaded too, they can
+    also be keys of JSON fields, see MetadataKey.
+    """
+    columns = get_metadata_columns(queryset.model)
+    aliases = {name: column.expression() for name, column in columns.items() if name not in selected}
+    annotations = {}
+    for name in selected:
+        column = columns.get(name) or parse_metadata_key(queryset.model, name)
+        if column:
+            annotations[column.name] = column.expression()
+    return queryset.alias(**aliases).annotate(**annotations)
@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from graphql import (
+    GraphQLError,
+    GraphQLList,
+    GraphQLObjectType,
+    get_named_type,
+    get_nullable_type,
+    get_operation_ast,
+)
+from graphql.execution.values import get_argument_values, get_variable_values
+
+from test_backend.base.documents import get_fragments, iter_field_nodes
+
+
+def get_role(user):
+    """
+    Returns the role of a user for the query limits: anonymous, robot,
+    user, staff or superuser.
+    """
+    if not user.is_authenticated:
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+    if user.is_staff:
+        return "staff"
+    if not getattr(user, "can_login", True):
+        return "robot"
+    return "user"
+
+
+def _count_filters(filters):
+    if isinstance(filters, list):
+        return sum(_count_filters(item) for item in filters)
+    if isinstance(filters, dict):
+        return 1 + _count_filters(filters.get("filters") or [])
+    return 0
+
+
+def _field_cost(arguments):
+    """
+    Cost of the arguments of a field: each filter node, and the ranked
+    searches, which read more rows.
+    """
+    cost = _count_filters(arguments.get("filters")) * settings.QUERY_COST_FILTER
+    search_mode = arguments.get("search_mode")
+    if arguments.get("search") and getattr(search_mode, "name", None) in ("FUZZY", "FULL_TEXT"):
+        cost += settings.QUERY_COST_RANKED_SEARCH
+    return cost
+
+
+def _selection_cost(parent_type, selection_set, fragments, variables, depth, list_size):
+    if depth > settings.QUERY_MAX_DEPTH:
+        raise GraphQLError(
+            "Queries can't be nested more than %s levels" % settings.QUERY_MAX_DEPTH,
+            extensions={"code": "QUERY_TOO_DEEP"},
+        )
+
+    cost = 0
+    # fields selected several times, like aliases, are counted each time
+    for field_node in iter_field_nodes(selection_set, fragments):
+        name = field_node.name.value
+        field = parent_type.fields.get(name)
+        if field is None or name.startswith("__"):
+            continue
+
+        arguments = get_argument_values(field, field_node, variables)
+        cost += _field_cost(arguments)
+
+        field_type = get_named_type(field.type)
+        if not isinstance(field_type, GraphQLObjectType) or field_node.selection_set is None:
+            continue
+
+        # the lists inside a paginated field have a page of items
+        page_size = arguments.get("page_size") if "pageSize" in field.args else None
+        children = _selection_cost(
+            field_type,
+            field_node.selection_set,
+            fragments,
+            variables,
+            depth + 1,
+            page_size or settings.QUERY_COST_LIST_SIZE,
+        )
+
+        items = list_size if isinstance(get_nullable_type(field.type), GraphQLList) else 1
+        cost += items * (1 + children)
+    return cost
+
+
+def get_query_cost(schema, document, variables, operation_name=None):
+    """
+    Returns the estimated cost of an operation, before running it: 1 for
+    each object, times the page size of the lists, plus the cost of the
+    filters and searches. Returns None if the variables are not valid, the
+    execution reports it.
+    """
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return None
+
+    coerced = get_variable_values(schema, operation.variable_definitions or (), variables or {})
+    if isinstance(coerced, list):
+        return None
+
+    root_type = schema.get_root_type(operation.operation)
+    try:
+        return _selection_cost(
+            root_type, operation.selection_set, get_fragments(document), coerced, 1, 1
+        )
+    except GraphQLError as e:
+        if e.extensions and e.extensions.get("code") == "QUERY_TOO_DEEP":
+            raise
+        # invalid arguments, the execution reports them
+        return None
+
+
+def check_query_cost(request, schema, document, variables, operation_name=None):
+    """
+    Rejects the operations over the budget of the role of the user, see
+    QUERY_COST_BUDGETS, before they reach the database.
+    """
+    budget = settings.QUERY_COST_BUDGETS[get_role(request.user)]
+    cost = get_query_cost(schema, document, variables, operation_name)
+    if cost is not None and cost > budget:
+        raise GraphQLError(
+            "The query is too expensive: its cost is %s and the limit is %s" % (cost, budget),
+            extensions={"code": "QUERY_TOO_EXPENSIVE", "cost": cost, "budget": budget},
+        )
+
+
+@contextmanager
+def statement_timeout(milliseconds):
+    """
+    Cancels the database statements that run longer than the given
+    milliseconds, on PostgreSQL.
+    """
+    if connection.vendor != "postgresql" or not milliseconds:
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET statement_timeout = %s", [int(milliseconds)])
+    try:
+        yield
+    finally:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET statement_timeout")
+        except DatabaseError:
+            # don't leave the timeout to the next request of the connection
+            connection.close()
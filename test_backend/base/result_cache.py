@@ -0,0 +1,163 @@
+import hashlib
+import json
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from graphql import GraphQLObjectType, OperationType, get_named_type, get_operation_ast, print_ast
+
+from test_backend.base.documents import get_fragments, iter_field_nodes
+
+cache = caches["results"]
+
+
+def version_key(model):
+    return f"result-version:{model._meta.label}"
+
+
+def get_versions(models):
+    """
+    Returns the current versions of the models, {label: version}.
+    """
+    keys = {version_key(model): model._meta.label for model in models}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        # a new version, so the results cached with an evicted one are not used
+        cache.add(key, uuid.uuid4().hex, None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_versions(*models):
+    """
+    Invalidates the cached results that read any of the models. Call it
+    after writes that send no signals, like QuerySet.update() and
+    bulk_create().
+    """
+    keys = {version_key(model._meta.concrete_model) for model in models}
+
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+    bump()
+    # again once committed, results cached while the transaction was open
+    # read the previous data
+    transaction.on_commit(bump)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_saved_model(sender, **kwargs):
+    bump_versions(sender)
+
+
+@receiver(m2m_changed)
+def bump_related_models(sender, instance, model, **kwargs):
+    bump_versions(sender, type(instance), model)
+
+
+def _collect_models(graphql_type, selection_set, fragments, models):
+    """
+    Adds the models of the object types in a selection, and the models
+    related to them. Returns False if a field is not in the schema.
+    """
+    graphql_type = get_named_type(graphql_type)
+    model = getattr(getattr(getattr(graphql_type, "graphene_type", None), "_meta", None), "model", None)
+    if model is not None and model not in models:
+        models.add(model)
+        models.update(
+            field.related_model for field in model._meta.get_fields() if field.related_model
+        )
+
+    if selection_set is None or not isinstance(graphql_type, GraphQLObjectType):
+        return True
+
+    for field_node in iter_field_nodes(selection_set, fragments):
+        name = field_node.name.value
+        if name == "__typename":
+            continue
+        field = graphql_type.fields.get(name)
+        if field is None:
+            return False
+        if not _collect_models(field.type, field_node.selection_set, fragments, models):
+            return False
+    return True
+
+
+def get_query_models(schema, document, operation_name=None):
+    """
+    Returns the models a query operation can read, or None if the
+    operation is not a query, or some of its root fields read no model.
+    """
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+
+    fragments = get_fragments(document)
+
+    models = set()
+    for field_node in iter_field_nodes(operation.selection_set, fragments):
+        field = schema.query_type.fields.get(field_node.name.value)
+        if field is None:
+            return None
+
+        field_models = set()
+        if not _collect_models(field.type, field_node.selection_set, fragments, field_models):
+            return None
+        if not field_models:
+            return None
+        models |= field_models
+
+    return models or None
+
+
+def get_result_key(request, schema, document, variables, operation_name=None):
+    """
+    Returns the cache key of the result of a query, or None if it can't
+    be cached, like for anonymous requests. The key has the versions of
+    the models read by the query, and of the models of the permissions of
+    the user.
+    """
+    if settings.RESULT_CACHE_TIMEOUT <= 0:
+        return None
+
+    # the user must be known before the execution, see
+    # UploadGraphQLView.authenticate
+    if not request.user.is_authenticated:
+        return None
+
+    models = get_query_models(schema, document, operation_name)
+    if models is None:
+        return None
+
+    models |= {get_user_model(), Group, Permission}
+    versions = get_versions(models)
+    data = json.dumps(
+        [
+            print_ast(document),
+            operation_name,
+            variables,
+            request.user.pk,
+            request.get_host(),
+            request.is_secure(),
+            sorted(versions.items()),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return "result:" + hashlib.sha256(data.encode()).hexdigest()
+
+
+def get_queryset_versions(queryset):
+    """
+    Returns the versions of the models of the tables read by a queryset.
+    """
+    tables = {join.table_name for join in queryset.query.alias_map.values()}
+    tables.add(queryset.model._meta.db_table)
+    return get_versions(model for model in apps.get_models() if model._meta.db_table in tables)
@@ -1,16 +1,25 @@
-from .pagination import resolve_with_pagination, PageInfoType
-from .mutations import TestMutation, TestDeleteMutation
+from .pagination import resolve_with_pagination, PageInfoType, CountModeEnum
+from .facets import resolve_facets, DateBucketEnum, FacetsType
+from .mutations import TestMutation, TestDeleteMutation, TestBatchCreateMutation
 from .search import FilterTypeInput
 from .sort import SortTypeInput
+from .text_search import SearchModeEnum, TextSearch
 from .auth import check_auth
 
 
 __all__ = [
     "resolve_with_pagination",
     "PageInfoType",
+    "CountModeEnum",
+    "resolve_facets",
+    "DateBucketEnum",
+    "FacetsType",
     "TestMutation",
     "TestDeleteMutation",
+    "TestBatchCreateMutation",
     "FilterTypeInput",
     "SortTypeInput",
+    "SearchModeEnum",
+    "TextSearch",
     "check_auth",
 ]
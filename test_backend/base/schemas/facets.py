@@ -0,0 +1,251 @@
+import hashlib
+from datetime import datetime
+
+import graphene
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import DateField, F, JSONField
+from django.db.models.functions import Trunc
+from graphql import GraphQLError
+
+from test_backend.base.metadata_columns import KEY_REGEX, get_metadata_column, parse_metadata_key
+from test_backend.base.result_cache import get_queryset_versions
+from test_backend.base.schemas.auth import check_auth
+from test_backend.base.schemas.pagination import filter_queryset
+
+
+class DateBucketEnum(graphene.Enum):
+    """
+    Size of the date buckets of a facet
+    """
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
+
+
+class FacetBucketType(graphene.ObjectType):
+    """
+    A value of a facet and the number of items with it
+    """
+
+    value = graphene.String(description="The value, as text, null for the items without one")
+    count = graphene.Int()
+
+
+class FacetType(graphene.ObjectType):
+    """
+    The counts of the values of a field, a JSON key or a date bucket
+    """
+
+    name = graphene.String(description="The field, the dot separated JSON key or the date field")
+    buckets = graphene.List(FacetBucketType)
+
+
+class FacetsType(graphene.ObjectType):
+    """
+    A type to return the facets of a filtered queryset.
+    """
+
+    total_count = graphene.Int()
+    facets = graphene.List(FacetType)
+
+
+def get_facet_expressions(model, fields, keys, json_field, date_field, date_bucket):
+    """
+    Returns the (name, expression) pairs of the facets to count.
+    """
+    facets = []
+    for field in fields or []:
+        column = get_metadata_column(model, field.name)
+        if column:
+            facets.append((field.name, column.expression()))
+            continue
+        if isinstance(model._meta.get_field(field.name), JSONField):
+            raise GraphQLError("Field %s is a JSON field, count its keys" % field.name)
+        facets.append((field.name, F(field.name)))
+
+    for key in keys or []:
+        path = key.split(".")
+        if not json_field or not all(KEY_REGEX.match(part) for part in path):
+            raise GraphQLError(
+                "Facet keys can only have letters, numbers and single underscores"
+            )
+        column = parse_metadata_key(model, "__".join([json_field, *path, "text"]))
+        facets.append((key, column.expression()))
+
+    if date_bucket:
+        facets.append(
+            (date_field, Trunc(date_field, date_bucket.value, output_field=DateField()))
+        )
+
+    if not facets:
+        raise GraphQLError("Give at least one field, key or date bucket to count")
+    if len(facets) > settings.FACETS_MAX_FACETS:
+        raise GraphQLError("At most %s facets can be counted at once" % settings.FACETS_MAX_FACETS)
+    return facets
+
+
+def facet_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _count_grouping_sets(queryset, aliases, limit, date_alias):
+    """
+    Counts the values of every facet in a single scan of the rows, with
+    GROUPING SETS, keeping the `limit` most common values of each facet,
+    and the `FACETS_MAX_BUCKETS` latest dates of the date facet.
+    """
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    columns = [quote(alias) for alias in aliases]
+    grouping = "GROUPING(%s)" % ", ".join(columns)
+
+    # GROUPING() has a bit set for each column left out of the set, from
+    # the last column up; the empty set is the total
+    full_mask = (1 << len(aliases)) - 1
+    masks = {full_mask ^ (1 << (len(aliases) - 1 - i)): i for i in range(len(aliases))}
+    date_mask = full_mask ^ 1 if date_alias else -1
+
+    sql, params = queryset.query.sql_with_params()
+    date_order = f", {quote(date_alias)} DESC" if date_alias else ""
+    sql = (
+        f"SELECT * FROM ("
+        f"SELECT {grouping} AS facet_set, {', '.join(columns)}, COUNT(*) AS facet_count, "
+        f"ROW_NUMBER() OVER (PARTITION BY {grouping} ORDER BY "
+        f"CASE WHEN {grouping} = %s THEN 0 ELSE COUNT(*) END DESC{date_order}) AS facet_rank "
+        f"FROM ({sql}) facet_rows "
+        f"GROUP BY GROUPING SETS ({', '.join('(%s)' % column for column in columns)}, ())"
+        f") facets WHERE facet_rank <= CASE WHEN facet_set = %s THEN %s ELSE %s END"
+    )
+    params = (date_mask, *params, date_mask, settings.FACETS_MAX_BUCKETS, limit)
+
+    total_count = 0
+    counts = [[] for _ in aliases]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for facet_set, *values, count, rank in cursor.fetchall():
+            if facet_set == full_mask:
+                total_count = count
+            else:
+                index = masks[facet_set]
+                counts[index].append((values[index], count))
+    return total_count, counts
+
+
+def _count_each(queryset, aliases, limit, date_alias):
+    """
+    Counts the values of every facet with a query each, for the databases
+    without GROUPING SETS.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+
+    counts = []
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM ({sql}) facet_rows", params)
+        total_count = cursor.fetchone()[0]
+        for alias in aliases:
+            column = connection.ops.quote_name(alias)
+            order = f"{column} DESC" if alias == date_alias else "COUNT(*) DESC"
+            cursor.execute(
+                f"SELECT {column}, COUNT(*) FROM ({sql}) facet_rows "
+                f"GROUP BY {column} ORDER BY {order} LIMIT %s",
+                (*params, settings.FACETS_MAX_BUCKETS if alias == date_alias else limit),
+            )
+            counts.append(cursor.fetchall())
+    return total_count, counts
+
+
+def count_facets(queryset, facets, limit, has_date=False):
+    """
+    Returns the total count of a queryset and the counts of the values of
+    its facets, cached for FACETS_CACHE_TIMEOUT seconds, or until the
+    tables counted are written.
+    """
+    aliases = [f"facet_{i}" for i in range(len(facets))]
+    queryset = queryset.order_by().annotate(
+        **{alias: expression for alias, (name, expression) in zip(aliases, facets)}
+    ).values(*aliases)
+    date_alias = aliases[-1] if has_date else None
+
+    timeout = settings.FACETS_CACHE_TIMEOUT
+    key = None
+    if timeout:
+        sql, params = queryset.query.sql_with_params()
+        versions = sorted(get_queryset_versions(queryset).items())
+        digest = hashlib.sha256(
+            (sql + repr(params) + repr((limit, has_date)) + repr(versions)).encode()
+        ).hexdigest()
+        key = f"facets:{queryset.model._meta.label}:{digest}"
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if connections[queryset.db].vendor == "postgresql":
+        result = _count_grouping_sets(queryset, aliases, limit, date_alias)
+    else:
+        result = _count_each(queryset, aliases, limit, date_alias)
+
+    if key:
+        cache.set(key, result, timeout)
+    return result
+
+
+def resolve_facets(
+    model,
+    info,
+    search,
+    filters,
+    fields=None,
+    keys=None,
+    date_bucket=None,
+    limit=10,
+    json_field=None,
+    date_field="created_at",
+):
+    """
+    A generic resolver function that counts the values of the fields, the
+    keys of json_field and the date_bucket of date_field, of the items
+    matching the search and filters, in a single query.
+
+    The buckets of the fields and keys are the `limit` most common values,
+    those of the dates are in order, up to FACETS_MAX_BUCKETS.
+    """
+    # check if request is authenticated
+    check_auth(info)
+
+    if not limit or not 1 <= limit <= settings.FACETS_MAX_BUCKETS:
+        raise GraphQLError("limit must be between 1 and %s" % settings.FACETS_MAX_BUCKETS)
+
+    facets = get_facet_expressions(model, fields, keys, json_field, date_field, date_bucket)
+    queryset = filter_queryset(model, search, filters, [])
+    total_count, counts = count_facets(queryset, facets, limit, has_date=bool(date_bucket))
+
+    results = []
+    for index, ((name, expression), values) in enumerate(zip(facets, counts)):
+        if date_bucket and index == len(facets) - 1:
+            # PostgreSQL truncates to the start of the day, as a timestamp
+            values = [
+                (value.date() if isinstance(value, datetime) else value, count)
+                for value, count in values
+            ]
+            values.sort(key=lambda item: (item[0] is None, item[0] or 0))
+        else:
+            values.sort(key=lambda item: (-item[1], item[0] is None, str(item[0])))
+        results.append(
+            FacetType(
+                name=name,
+                buckets=[
+                    FacetBucketType(value=facet_value(value), count=count)
+                    for value, count in values
+                ],
+            )
+        )
+    return FacetsType(total_count=total_count, facets=results)
@@ -0,0 +1,122 @@
+from django.core.exceptions import ValidationError
+from graphene.utils.str_converters import to_snake_case
+from graphql.execution.collect_fields import collect_fields
+from graphql.execution.values import get_argument_values
+
+from test_backend.base.schemas.selection import get_selection, optimize_queryset
+
+
+class ModelLoader:
+    """
+    Loads model instances by the values of a field, several values in a
+    single query, and keeps them for the rest of the request.
+    """
+
+    def __init__(self, queryset, field_name="pk"):
+        self.queryset = queryset
+        self.field_name = field_name
+        self.field = (
+            queryset.model._meta.pk if field_name == "pk" else queryset.model._meta.get_field(field_name)
+        )
+        self.cache = {}
+        self.pending = set()
+
+    def prepare(self, value):
+        """
+        Adds a value to load with the next query.
+        """
+        try:
+            key = self.field.to_python(value)
+        except ValidationError as e:
+            self.cache[value] = e
+            return value
+
+        if key not in self.cache:
+            self.pending.add(key)
+        return key
+
+    def load(self, value):
+        """
+        Returns the instance with the value, or None if there is none.
+        """
+        key = self.prepare(value)
+        if self.pending:
+            self.cache.update(dict.fromkeys(self.pending))
+            lookup = {f"{self.field_name}__in": self.pending}
+            # when the field is not unique the lowest pk is kept, like first()
+            for instance in self.queryset.filter(**lookup).order_by("-pk"):
+                self.cache[getattr(instance, self.field.attname)] = instance
+            self.pending = set()
+
+        result = self.cache[key]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def get_loaders(info):
+    """
+    Returns the loaders of the current request.
+    """
+    loaders = getattr(info.context, "graphql_loaders", None)
+    if loaders is None:
+        loaders = info.context.graphql_loaders = {}
+    return loaders
+
+
+def get_sibling_fields(info):
+    """
+    Returns the (arguments, field nodes) of every selection of the root
+    field being resolved, aliases included.
+    """
+    if info.path.prev is not None:
+        return [({}, info.field_nodes)]
+
+    fields = collect_fields(
+        info.schema,
+        info.fragments,
+        info.variable_values,
+        info.parent_type,
+        info.operation.selection_set,
+    )
+    field_definition = info.parent_type.fields[info.field_name]
+
+    siblings = []
+    for nodes in fields.values():
+        if nodes[0].name.value == info.field_name:
+            arguments = get_argument_values(field_definition, nodes[0], info.variable_values)
+            siblings.append(({to_snake_case(k): v for k, v in arguments.items()}, nodes))
+    return siblings
+
+
+def load_by_lookup(info, object_type, lookups, **arguments):
+    """
+    Resolves a root field that gets an object by one of several lookup
+    arguments, {argument: model field}, the first given one is used.
+
+    The objects of every selection of the field in the operation, e.g.
+    fifty aliases, are loaded at once, with a single query per lookup
+    field and only the selected columns.
+    """
+    loaders = get_loaders(info)
+    key = (info.parent_type.name, info.field_name)
+
+    if key not in loaders:
+        siblings = get_sibling_fields(info)
+        selection = get_selection(info, [node for _, nodes in siblings for node in nodes])
+        lookup_fields = [field for field in lookups.values() if field != "pk"]
+        queryset = optimize_queryset(
+            object_type._meta.model.objects.all(), object_type, selection, lookup_fields
+        )
+        loaders[key] = {field: ModelLoader(queryset, field) for field in lookups.values()}
+
+        for sibling_arguments, _ in siblings:
+            for argument, field in lookups.items():
+                if sibling_arguments.get(argument):
+                    loaders[key][field].prepare(sibling_arguments[argument])
+                    break
+
+    for argument, field in lookups.items():
+        if arguments.get(argument):
+            return loaders[key][field].load(arguments[argument])
+    return None
@@ -1,10 +1,24 @@
 import re
 from collections import OrderedDict
+from django.conf import settings
+from django.db import transaction
 from django.db.models import ForeignKey, OneToOneField, ManyToManyField, JSONField, FileField
 from django.db.models.fields import Field
 from django.forms import modelform_factory
 
-from graphene import Field, InputField, ID, Mutation, Argument, NonNull, List, String
+from graphene import (
+    Field,
+    InputField,
+    ID,
+    Int,
+    Mutation,
+    Argument,
+    NonNull,
+    List,
+    String,
+    ObjectType,
+    InputObjectType,
+)
 from graphene.relay.mutation import maybe_thenable
 from graphene.types.mutation import MutationOptions
 from graphene.types.dynamic import Dynamic
@@ -18,6 +32,7 @@ from graphene_django.forms.mutation import (
     get_global_registry,
 )
 
+from test_backend.base.result_cache import bump_versions
 from test_backend.base.schemas.auth import check_auth
 from test_backend.base.schemas.custom_scalars import JSONObject
 
@@ -61,7 +76,10 @@ def fields_from_model(model, only_fields, exclude_fields, input=True):
             in exclude_fields
         )
 
-        if is_not_in_only or is_excluded:
+        # fields filled by the model itself can't be set from the input
+        is_not_editable = input and not model_field.editable and not model_field.primary_key
+
+        if is_not_in_only or is_excluded or is_not_editable:
             continue
     
         registry = get_global_registry()
@@ -220,6 +238,7 @@ class BaseMutation(Mutation):
             # `save` method won't exist on plain Django forms, but this mutation can
             # in theory be used with `ModelForm`s as well and we do want to save them.
             instance = form.save()
+            bump_versions(cls.model_class)
 
             return cls(errors=[], **instance.to_dict(fields=cls._meta.fields.keys()))
         return cls(errors=[], **form.cleaned_data)
@@ -296,4 +315,167 @@ class TestDeleteMutation(BaseMutation):
     def mutate_and_get_payload(cls, root, info, **input):
         id = input["id"]
         cls.get_queryset(cls.model_class.objects.all(), info).get(id=id).delete()
+        bump_versions(cls.model_class)
         return cls(id=id, message=f"{cls.model_class.__name__} deleted")
+
+
+
+class TestBatchCreateMutation(Mutation):
+    """
+    Base batch create mutation class for test. Validates all the items
+    of the batch together and inserts the valid ones with a single bulk
+    insert, returning the errors of each item.
+    """
+
+    errors = List(ErrorType)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(
+        cls, model_class=None, only_fields=(), exclude_fields=(), **options
+    ):
+
+        if not model_class:
+            raise Exception("model_class is required for TestBatchCreateMutation")
+
+        cls.model_class = model_class
+        model_name = model_class.__name__
+
+        input_fields = fields_from_model(model_class, only_fields, exclude_fields)
+        input_fields.pop('id', None)
+        cls.input_field_names = list(input_fields.keys())
+
+        item_input = type(
+            f"{model_name}BatchInput",
+            (InputObjectType,),
+            yank_fields_from_attrs(input_fields, _as=InputField),
+        )
+
+        item_result = type(
+            f"{model_name}BatchResultType",
+            (ObjectType,),
+            {
+                "index": Int(description="Position of the item in the batch"),
+                "id": ID(description="Id of the created item"),
+                "errors": List(ErrorType),
+                "__doc__": f"Result of each {model_name} of the batch.",
+            },
+        )
+
+        cls.result_type = item_result
+
+        _meta = TestMutationOptions(cls)
+        _meta.fields = yank_fields_from_attrs({"results": List(item_result)}, _as=Field)
+
+        super().__init_subclass_with_meta__(
+            _meta=_meta,
+            arguments={"items": Argument(List(NonNull(item_input)), required=True)},
+            **options,
+        )
+
+    @classmethod
+    def mutate(cls, root, info, items):
+        # check if request is authenticated
+        check_auth(info)
+
+        if len(items) > settings.BATCH_CREATE_MAX_ITEMS:
+            _set_errors_flag_to_context(info)
+            return cls(
+                errors=ErrorType.from_errors(
+                    {"items": [f"A batch can't have more than {settings.BATCH_CREATE_MAX_ITEMS} items"]}
+                ),
+                results=[],
+            )
+
+        forms = cls.get_forms([dict(item) for item in items])
+        item_errors = cls.validate_unique(forms)
+
+        valid = [
+            (index, form) for index, form in enumerate(forms)
+            if form.is_valid() and index not in item_errors
+        ]
+        instances = [form.save(commit=False) for _, form in valid]
+
+        with transaction.atomic():
+            # references taken before the insert are rolled back with it
+            cls.before_bulk_create(instances)
+            cls.model_class._default_manager.bulk_create(instances)
+            cls.after_bulk_create(instances)
+            bump_versions(cls.model_class)
+
+        results = []
+        created = {index: instance for (index, _), instance in zip(valid, instances)}
+        for index, form in enumerate(forms):
+            if index in created:
+                results.append(cls.result_type(index=index, id=created[index].pk, errors=[]))
+            else:
+                errors = {**form.errors, **item_errors.get(index, {})}
+                results.append(cls.result_type(index=index, errors=ErrorType.from_errors(errors)))
+
+        if len(created) < len(forms):
+            _set_errors_flag_to_context(info)
+
+        return cls(errors=[], results=results)
+
+    @classmethod
+    def get_forms(cls, items):
+        # every item is validated against all the input fields, so missing
+        # required values are reported, and uniqueness once for the batch
+        form_class = type(
+            "BatchForm",
+            (create_dynamic_form(cls.model_class, dict.fromkeys(cls.input_field_names)),),
+            {"validate_unique": lambda self: None},
+        )
+
+        forms = []
+        for item in items:
+            file_data = {
+                field.name: item[field.name]
+                for field in cls.model_class._meta.fields
+                if isinstance(field, FileField) and field.name in item
+            }
+            forms.append(form_class(item, file_data or None))
+
+        return forms
+
+    @classmethod
+    def validate_unique(cls, forms):
+        """
+        Checks the unique fields of all the items with one query per field,
+        returns the errors by item index. Only the values of valid items
+        count as taken.
+        """
+        errors = {}
+        valid = {index for index, form in enumerate(forms) if form.is_valid()}
+        unique_fields = [
+            field for field in cls.model_class._meta.fields
+            if field.unique and not field.primary_key
+        ]
+        for field in unique_fields:
+            values = [form.data.get(field.name) for form in forms]
+            existing = set(
+                cls.model_class._default_manager.filter(
+                    **{f"{field.name}__in": [value for value in values if value is not None]}
+                ).values_list(field.name, flat=True)
+            )
+            seen = set()
+            for index, value in enumerate(values):
+                if value is None:
+                    continue
+                if value in existing or value in seen:
+                    message = f"{cls.model_class.__name__} with this {field.verbose_name} already exists."
+                    errors.setdefault(index, {})[field.name] = [message]
+                elif index in valid and index not in errors:
+                    seen.add(value)
+
+        return errors
+
+    @classmethod
+    def before_bulk_create(cls, instances):
+        pass
+
+    @classmethod
+    def after_bulk_create(cls, instances):
+        pass
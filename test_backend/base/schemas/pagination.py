@@ -1,9 +1,31 @@
+import base64
+import hashlib
+import json
 import math
 import graphene
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from graphql import GraphQLError, get_named_type
 
+from test_backend.base.metadata_columns import get_metadata_column, with_metadata_columns
+from test_backend.base.result_cache import get_queryset_versions
 from test_backend.base.schemas.auth import check_auth
-from test_backend.base.schemas.search import build_filter_criteria
-from test_backend.base.schemas.sort import sort_queryset
+from test_backend.base.schemas.rows import get_row_queryset
+from test_backend.base.schemas.search import compile_filter
+from test_backend.base.schemas.selection import get_selection, is_selected, optimize_queryset
+from test_backend.base.schemas.sort import get_sort_params
+
+
+class CountModeEnum(graphene.Enum):
+    """
+    How the total count of a paginated query is computed
+    """
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
 
 
 class PageInfoType(graphene.ObjectType):
@@ -17,6 +39,194 @@ class PageInfoType(graphene.ObjectType):
     has_prev_page = graphene.Boolean()
     page_size = graphene.Int()
     current_page = graphene.Int()
+    start_cursor = graphene.String(description="Cursor of the first item, to use in before")
+    end_cursor = graphene.String(description="Cursor of the last item, to use in after")
+
+    def resolve_start_cursor(self, info):
+        items = list(self.items)
+        return encode_cursor(self.ordering, items[0]) if items and self.ordering else None
+
+    def resolve_end_cursor(self, info):
+        items = list(self.items)
+        return encode_cursor(self.ordering, items[-1]) if items and self.ordering else None
+
+
+def get_ordering(sort, model=None):
+    """
+    Returns the order_by params of the sort list, with the pk as the last
+    one so the order is the same in every query. The pk goes in the same
+    direction as the last sort, so an index on (field, pk) can be scanned
+    for it.
+    """
+    ordering = get_sort_params(sort, model) if sort else []
+    if not any(param.lstrip("-") in ("pk", "id") for param in ordering):
+        ordering.append("-pk" if ordering and ordering[-1].startswith("-") else "pk")
+    return ordering
+
+
+def _get_field(model, param):
+    name = param.lstrip("-")
+    if name == "pk":
+        return model._meta.pk
+
+    metadata_column = get_metadata_column(model, name)
+    return metadata_column.field if metadata_column else model._meta.get_field(name)
+
+
+def encode_cursor(ordering, obj):
+    """
+    Returns an opaque cursor with the values of the ordering fields of an item.
+    """
+    values = []
+    for param in ordering:
+        field = _get_field(obj._meta.model, param)
+        # value_to_string keeps the full precision of dates and numbers
+        value = getattr(obj, field.attname)
+        values.append(None if value is None else field.value_to_string(obj))
+
+    data = json.dumps({"o": ordering, "v": values})
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(model, ordering, cursor):
+    """
+    Returns the values of the ordering fields in a cursor.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        cursor_ordering, cursor_values = data["o"], list(data["v"])
+    except (ValueError, TypeError, KeyError):
+        raise GraphQLError("Invalid cursor")
+
+    # the values are converted with the fields of the current ordering only
+    if cursor_ordering != ordering or len(cursor_values) != len(ordering):
+        raise GraphQLError("The cursor was given for another sort")
+
+    try:
+        return [
+            None if value is None else _get_field(model, param).to_python(value)
+            for param, value in zip(ordering, cursor_values)
+        ]
+    except (ValueError, TypeError, ValidationError, FieldDoesNotExist):
+        raise GraphQLError("Invalid cursor")
+
+
+def _seek_condition(model, param, value):
+    """
+    Condition for the rows after a value of an ordering param, with
+    PostgreSQL's order of nulls: last when ascending, first when descending.
+    """
+    field = _get_field(model, param)
+    descending = param.startswith("-")
+    nullable = field.null
+
+    if value is None:
+        # nulls first, the rows after are the non null ones
+        if descending:
+            return Q(**{f"{field.attname}__isnull": False})
+        # nulls last, nothing comes after
+        return Q(pk__in=[])
+
+    condition = Q(**{f"{field.attname}__{'lt' if descending else 'gt'}": value})
+    if nullable and not descending:
+        condition |= Q(**{f"{field.attname}__isnull": True})
+    return condition
+
+
+def seek_criteria(model, ordering, values):
+    """
+    Builds the criteria of the rows after the given values in the
+    ordering, (a, b) > (x, y) as a = x and b > y or a > x.
+    """
+    criteria = Q(pk__in=[])
+    equal = Q()
+    for param, value in zip(ordering, values):
+        criteria |= equal & _seek_condition(model, param, value)
+
+        attname = _get_field(model, param).attname
+        if value is None:
+            equal &= Q(**{f"{attname}__isnull": True})
+        else:
+            equal &= Q(**{attname: value})
+
+    return criteria
+
+
+def order_expressions(model, ordering):
+    """
+    Returns the order_by expressions of the ordering params, with the
+    nulls placed as expected by the cursors.
+    """
+    expressions = []
+    for param in ordering:
+        field = _get_field(model, param)
+        if not field.null:
+            expressions.append(param)
+        elif param.startswith("-"):
+            expressions.append(F(param[1:]).desc(nulls_first=True))
+        else:
+            expressions.append(F(param).asc(nulls_last=True))
+    return expressions
+
+
+def reverse_ordering(ordering):
+    return [param[1:] if param.startswith("-") else "-" + param for param in ordering]
+
+
+def estimate_count(queryset, filtered):
+    """
+    Returns the number of rows estimated by PostgreSQL: the table
+    statistics for unfiltered querysets, the query plan otherwise. Returns
+    None if there is no estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not filtered:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            estimate = cursor.fetchone()[0]
+        else:
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]["Plan"]["Plan Rows"]
+
+    # tables never analyzed have no statistics
+    return int(estimate) if estimate and estimate > 0 else None
+
+
+def count_items(queryset, count_mode=None, filtered=True):
+    """
+    Counts the items of a queryset. Estimated counts are much cheaper on
+    big tables, exact counts are cached for PAGINATION_COUNT_CACHE_TIMEOUT
+    seconds, or until the tables counted are written.
+    """
+    if count_mode and count_mode.name == "ESTIMATED":
+        estimate = estimate_count(queryset, filtered)
+        if estimate is not None:
+            return estimate
+
+    timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
+    if not timeout:
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    versions = sorted(get_queryset_versions(queryset).items())
+    digest = hashlib.sha256((sql + repr(params) + repr(versions)).encode()).hexdigest()
+    key = f"pagination-count:{queryset.model._meta.label}:{digest}"
+
+    total_count = cache.get(key)
+    if total_count is None:
+        total_count = queryset.count()
+        cache.set(key, total_count, timeout)
+    return total_count
 
 
 class PaginationType(graphene.ObjectType):
@@ -31,24 +241,34 @@ class PaginationType(graphene.ObjectType):
         abstract = True
 
     @classmethod
-    def resolve_items(cls, queryset, page_size, page):
-        # Get the total count of items
-        total_count = queryset.count()
+    def resolve_items(cls, queryset, page_size, page, total_count=None):
+        # Count the items if the count is not given
+        if total_count is None and not page_size:
+            total_count = queryset.count()
 
-        # Get total pages
-        total_pages = math.ceil(total_count / page_size)
+        if total_count is None:
+            # one more item tells if there is another page
+            offset = (page - 1) * page_size if page else 0
+            items = list(queryset[offset : offset + page_size + 1])
+            has_next_page = len(items) > page_size
+            queryset = items[:page_size]
+            total_pages = None
+        else:
+            # Get total pages
+            total_pages = math.ceil(total_count / page_size)
+            has_next_page = True if (page + 1) <= total_pages else False
 
-        if page and page_size:
-            queryset = queryset[(page - 1) * page_size :]
+            if page and page_size:
+                queryset = queryset[(page - 1) * page_size :]
 
-        if page_size:
-            queryset = queryset[:page_size]
+            if page_size:
+                queryset = queryset[:page_size]
 
         # Create the pagination info object
         page_info = PageInfoType(
             total_count=total_count,
             total_pages=total_pages,
-            has_next_page=True if (page + 1) <= total_pages else False,
+            has_next_page=has_next_page,
             has_prev_page=True if (page - 1) != 0 else False,
             page_size=page_size,
             current_page=page,
@@ -57,6 +277,44 @@ class PaginationType(graphene.ObjectType):
         # Return the paginated results and pagination info object
         return (queryset, page_info)
 
+    @classmethod
+    def resolve_items_with_cursor(
+        cls, queryset, ordering, page_size, after=None, before=None, total_count=None
+    ):
+        """
+        Keyset pagination: returns the page of items right after or before
+        a cursor, seeking with the ordering values instead of an offset.
+        """
+        if not page_size or page_size < 1:
+            raise GraphQLError("pageSize must be greater than 0 to use cursors")
+
+        model = queryset.model
+
+        if before:
+            values = decode_cursor(model, ordering, before)
+            queryset = queryset.filter(seek_criteria(model, reverse_ordering(ordering), values))
+            queryset = queryset.order_by(*order_expressions(model, reverse_ordering(ordering)))
+        elif after:
+            values = decode_cursor(model, ordering, after)
+            queryset = queryset.filter(seek_criteria(model, ordering, values))
+
+        # one more item tells if there is another page
+        items = list(queryset[: page_size + 1])
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if before:
+            items.reverse()
+
+        page_info = PageInfoType(
+            total_count=total_count,
+            total_pages=None if total_count is None else math.ceil(total_count / page_size),
+            has_next_page=True if before else has_more,
+            has_prev_page=has_more if before else True,
+            page_size=page_size,
+        )
+
+        return (items, page_info)
+
 
 class PaginatedResultType(PaginationType):
     """
@@ -70,31 +328,106 @@ class PaginatedResultType(PaginationType):
         self.items = items
 
 
-def resolve_with_pagination(model, info, search, filters, sort, page_size, page):
+def filter_queryset(model, search, filters, ordering):
     """
-    A generic resolver function that applies pagination to a queryset and returns a paginated response.
+    Returns the queryset of the model with the search, filters and
+    ordering applied.
     """
-    # check if request is authenticated
-    check_auth(info)
+    # Get the queryset for the model, with the metadata columns to filter
+    # and sort on, the sorted ones are loaded for the cursors
+    queryset = with_metadata_columns(
+        model.objects.all(), [param.lstrip("-") for param in ordering]
+    )
 
-    # Get the queryset for the model
-    queryset = model.objects.all()
-
-    # Apply search if specified
+    # Apply search if specified, a Q or a function like TextSearch's
     if search:
-        queryset = queryset.filter(search)
+        queryset = queryset.filter(search) if isinstance(search, Q) else search(queryset)
 
     # Apply filters if specified
     if filters:
-        filter_criteria = build_filter_criteria(model, filters)
+        filter_criteria = compile_filter(model, filters)
         queryset = queryset.filter(filter_criteria)
 
-    # Apply order to queryset if specified
-    if sort:
-        queryset = sort_queryset(queryset, sort)
+    # Apply order to queryset
+    return queryset.order_by(*order_expressions(model, ordering))
+
+
+def is_ranked(queryset):
+    return "search_rank" in queryset.query.annotations
+
+
+def resolve_with_pagination(
+    model, info, search, filters, sort, page_size, page, after=None, before=None, count_mode=None
+):
+    """
+    A generic resolver function that applies pagination to a queryset and returns a paginated response.
+
+    The pages are selected with page, or with the after or before cursors
+    of a previous page, which are faster for deep pages and stable when
+    items are added. The items are only counted when totalCount or
+    totalPages are requested.
+    """
+    # check if request is authenticated
+    check_auth(info)
+
+    if not page_size or not 1 <= page_size <= settings.PAGINATION_MAX_PAGE_SIZE:
+        raise GraphQLError(
+            "pageSize must be between 1 and %s" % settings.PAGINATION_MAX_PAGE_SIZE
+        )
+
+    ordering = get_ordering(sort, model)
+    queryset = filter_queryset(model, search, filters, ordering)
+
+    # ranked searches return the best matches first, unless sorted; the
+    # cursors only follow the sort fields, so they can't page by rank
+    ranked = is_ranked(queryset) and not sort
+    if ranked:
+        if after or before:
+            raise GraphQLError("Ranked searches are paginated with page, or sorted to use cursors")
+        queryset = queryset.order_by("-search_rank", *order_expressions(model, ordering))
+
+    selection = get_selection(info)
+
+    # load only the columns and relations of the selected fields
+    items_type = get_named_type(get_named_type(info.return_type).fields["items"].type)
+    object_type = getattr(items_type, "graphene_type", None)
+    if "items" in selection and hasattr(getattr(object_type, "_meta", None), "model"):
+        ordering_fields, ordering_columns = [], []
+        for param in ordering:
+            if get_metadata_column(model, param.lstrip("-")):
+                ordering_columns.append(param.lstrip("-"))
+            else:
+                ordering_fields.append(_get_field(model, param).name)
+
+        # plain columns are loaded as rows, without building model instances
+        rows = get_row_queryset(
+            queryset, object_type, selection["items"], ordering_fields + ordering_columns
+        )
+        if rows is not None:
+            queryset = rows
+        else:
+            queryset = optimize_queryset(queryset, object_type, selection["items"], ordering_fields)
+
+    total_count = None
+    if is_selected(selection, "pageInfo", "totalCount") or is_selected(
+        selection, "pageInfo", "totalPages"
+    ):
+        total_count = count_items(queryset, count_mode, filtered=bool(search or filters))
 
     # Apply pagination to the queryset
-    queryset, page_info = PaginationType.resolve_items(queryset, page_size, page)
+    if after or before:
+        queryset, page_info = PaginationType.resolve_items_with_cursor(
+            queryset, ordering, page_size, after, before, total_count
+        )
+    else:
+        queryset, page_info = PaginationType.resolve_items(
+            queryset, page_size, page, total_count
+        )
+
+    # the cursors are built from the page items, there are none for
+    # pages ordered by rank
+    page_info.items = queryset
+    page_info.ordering = None if ranked else ordering
 
     # Return the paginated results and pagination info object
     return PaginatedResultType(items=queryset, page_info=page_info)
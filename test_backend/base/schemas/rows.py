@@ -0,0 +1,94 @@
+from django.db.models.query import ValuesListIterable
+
+from test_backend.base.lru import LRUCache
+from test_backend.base.schemas.selection import get_query_fields
+
+# row classes by (model, columns), a query selects a few sets of columns
+row_classes = LRUCache(256)
+
+
+class Row:
+    """
+    The columns of a model row, as light read-only objects with slots
+    instead of model instances. Types that extend RowTypeMixin resolve
+    them like model instances.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @property
+    def pk(self):
+        return getattr(self, self._meta.pk.attname)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.pk}>"
+
+
+class RowIterable(ValuesListIterable):
+    """
+    Yields a Row for each row of a values_list() queryset.
+    """
+
+    row_class = Row
+
+    def __iter__(self):
+        row_class = self.row_class
+        for values in super().__iter__():
+            yield row_class(values)
+
+
+class RowTypeMixin:
+    """
+    Lets a DjangoObjectType resolve Row objects: the paginated queries
+    return rows for it when the selected fields are plain columns.
+    """
+
+    @classmethod
+    def is_type_of(cls, root, info):
+        if isinstance(root, Row):
+            return root._meta.concrete_model is cls._meta.model
+        return super().is_type_of(root, info)
+
+
+def get_row_iterable(model, columns):
+    key = (model, columns)
+    iterable = row_classes.get(key)
+    if iterable is None:
+        row_class = type(
+            f"{model.__name__}Row", (Row,), {"__slots__": columns, "_meta": model._meta}
+        )
+        iterable = type(f"{model.__name__}RowIterable", (RowIterable,), {"row_class": row_class})
+        row_classes.set(key, iterable)
+    return iterable
+
+
+def get_row_queryset(queryset, object_type, selection, extra=()):
+    """
+    Returns the queryset as Row objects with the columns needed to resolve
+    the selection of a RowTypeMixin type, or None if the type needs model
+    instances: it is not a RowTypeMixin, or a selected field reads a
+    relation.
+    """
+    if not issubclass(object_type, RowTypeMixin):
+        return None
+
+    model = queryset.model
+    annotations = set(queryset.query.annotation_select)
+    query_fields = get_query_fields(
+        object_type, selection, [name for name in extra if name not in annotations]
+    )
+    if query_fields is None:
+        return None
+
+    only, prefetch = query_fields
+    if prefetch or any(model._meta.get_field(name).is_relation for name in only):
+        return None
+
+    columns = tuple(sorted(only)) + tuple(name for name in extra if name in annotations)
+    queryset = queryset.values_list(*columns)
+    queryset._iterable_class = get_row_iterable(model, columns)
+    return queryset
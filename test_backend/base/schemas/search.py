@@ -1,9 +1,17 @@
+import json
 import graphene
 from typing import Optional
+from uuid import UUID
 from datetime import datetime as dt
-from django.db.models import JSONField, Q
+from django.conf import settings
+from django.db.models import JSONField, Q, Value
+from django.db.models.lookups import Exact
 from graphql import GraphQLError
 
+from test_backend.base.lookups import JSONTypeOf, json_path
+from test_backend.base.lru import LRUCache
+from test_backend.base.metadata_columns import get_metadata_column, get_metadata_columns
+
 
 class date:
     def __call__(self, date_str):
@@ -38,6 +46,14 @@ class DateTime:
             )
 
 
+class uuid:
+    def __call__(self, uuid_str):
+        try:
+            return str(UUID(uuid_str))
+        except ValueError:
+            raise ValueError("Invalid UUID format.")
+
+
 class InputTypeEnum(graphene.Enum):
     """
     Supported input value types
@@ -51,6 +67,7 @@ class InputTypeEnum(graphene.Enum):
     Date = date()
     Time = time()
     DateTime = DateTime()
+    UUID = uuid()
 
 
 class SearchOperatorEnum(graphene.Enum):
@@ -66,6 +83,11 @@ class SearchOperatorEnum(graphene.Enum):
     lte = "lte"
     contains = "icontains"
     notContains = "not_icontains"
+    jsonContains = "json_contains"
+    hasKey = "has_key"
+    IN = "any"
+    notIn = "not_any"
+    between = "range"
     OR = "or"
     AND = "and"
 
@@ -75,6 +97,7 @@ def create_field_enum(model):
     Dinamycally creates enum for fields in a model.
     """
     field_enum_values = {field.name.lower(): field.name for field in model._meta.fields}
+    field_enum_values.update({name: name for name in get_metadata_columns(model)})
     FieldEnum = graphene.Enum(model.__name__ + "FieldEnum", field_enum_values)
 
     return FieldEnum
@@ -91,6 +114,14 @@ class FilterTypeInput(graphene.InputObjectType):
     operator = graphene.Field(
         SearchOperatorEnum, description="Filter operator", required=True
     )
+    values = graphene.List(
+        graphene.NonNull(graphene.String),
+        description="Values to filter on, for the IN, notIn and between operators",
+    )
+    path = graphene.List(
+        graphene.NonNull(graphene.String),
+        description="Keys of the value to filter on, in JSON fields",
+    )
     filters: Optional[graphene.List] = None
 
     @classmethod
@@ -112,6 +143,10 @@ class FilterTypeInput(graphene.InputObjectType):
         )
 
 
+# operators with a list of values
+LIST_OPERATORS = ("IN", "notIn", "between")
+
+
 def validate_value_n_operator(value, value_type, operator):
     string_ops = ["eq", "neq", "contains", "notContains"]
 
@@ -152,6 +187,134 @@ def validate_value_n_operator(value, value_type, operator):
     raise GraphQLError(msg)
 
 
+def is_column_value(metadata_column, value):
+    """
+    Checks if a value of a JSON key compares the same on its metadata
+    column, only texts with text columns and numbers with numeric ones.
+    """
+    if metadata_column.sql_type == "text":
+        return isinstance(value, str)
+    if metadata_column.sql_type == "double precision":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return False
+
+
+def parse_values(filter_input):
+    """
+    Returns the values of a list operator, parsed with the valueType.
+    """
+    operator = filter_input.operator.name
+    values = list(filter_input.values or [])
+    if not values:
+        raise GraphQLError("Operator %s needs a list of values" % operator)
+    if operator == "between" and len(values) != 2:
+        raise GraphQLError("Operator between needs two values, the lower and upper bounds")
+
+    if filter_input.value_type:
+        values = [filter_input.value_type.value(value) for value in values]
+
+    if operator == "between" and any(isinstance(value, bool) for value in values):
+        raise GraphQLError("Can't use operator between with value type %s" % bool)
+    return values
+
+
+def build_list_criteria(field_name, model_field, filter_input):
+    """
+    Builds the criteria of the list operators, IN and notIn as a single
+    = ANY(...) and between as a BETWEEN range.
+    """
+    if isinstance(model_field, JSONField):
+        raise GraphQLError(
+            "Operator %s needs a path on JSON fields" % filter_input.operator.name
+        )
+
+    values = parse_values(filter_input)
+    op = filter_input.operator.value
+    if op.startswith("not_"):
+        return ~Q(**{f"{field_name}__{op[4:]}": values})
+    return Q(**{f"{field_name}__{op}": values})
+
+
+def wrap_json_path(path, value):
+    """
+    Nests a value in the keys of a path: ["a", "b"], 1 -> {"a": {"b": 1}}.
+    """
+    for key in reversed(path):
+        value = {key: value}
+    return value
+
+
+def build_json_criteria(model_field, filter_input):
+    """
+    Builds the criteria of a filter on a path of a JSON field. Equality,
+    containment and key checks are written as @> and @? on the whole
+    field, so they can use its jsonb_path_ops GIN index.
+    """
+    if not isinstance(model_field, JSONField):
+        raise GraphQLError("Field %s is not a JSON field" % model_field.name)
+
+    name = model_field.name
+    path = list(filter_input.path or [])
+    operator = filter_input.operator.name
+    value = filter_input.value
+
+    if operator == "hasKey":
+        keys = path + ([value] if value else [])
+        if not keys:
+            raise GraphQLError("hasKey needs a path or a key as value")
+        return Q(**{f"{name}__path_exists": keys})
+
+    if operator == "jsonContains":
+        try:
+            document = json.loads(value)
+        except (TypeError, ValueError):
+            raise GraphQLError("Value for jsonContains must be a JSON document")
+        return Q(**{f"{name}__contains": wrap_json_path(path, document)})
+
+    if not path:
+        raise GraphQLError("Operator %s needs a path on JSON fields" % operator)
+
+    lookup = "__".join([name, *path])
+    if operator in LIST_OPERATORS:
+        values = parse_values(filter_input)
+        if operator == "between":
+            value_type = "number" if isinstance(values[0], (int, float)) else "string"
+            return (
+                Q(**{f"{lookup}__gte": values[0], f"{lookup}__lte": values[1]})
+                & Q(Exact(JSONTypeOf(json_path(name, path)), Value(value_type)))
+            )
+        q = Q(**{f"{lookup}__in": values})
+        return ~q if operator == "notIn" else q
+
+    # check if valueType was setted, if so, parse value
+    if value is not None and filter_input.value_type:
+        value = filter_input.value_type.value(value)
+
+    # validate match between operator and value
+    validate_value_n_operator(value, filter_input.value_type, filter_input.operator)
+
+    if value is None:
+        # a missing key
+        q = Q(**{f"{lookup}__isnull": True})
+        return q if operator == "eq" else ~q
+
+    op = filter_input.operator.value
+    if op == "exact":
+        return Q(**{f"{name}__contains": wrap_json_path(path, value)}) & Q(**{lookup: value})
+
+    if op.startswith("not_"):
+        return ~Q(**{f"{lookup}__{op[4:]}": value})
+
+    if op in ("gt", "gte", "lt", "lte"):
+        # JSON values of other types are sorted apart, compare only the same type
+        value_type = "number" if isinstance(value, (int, float)) else "string"
+        return Q(**{f"{lookup}__{op}": value}) & Q(
+            Exact(JSONTypeOf(json_path(name, path)), Value(value_type))
+        )
+
+    return Q(**{f"{lookup}__{op}": value})
+
+
 def build_filter_criteria(model, filter_input):
     """
     Helper function to recursively build the search criteria.
@@ -169,8 +332,17 @@ def build_filter_criteria(model, filter_input):
                 q |= build_filter_criteria(model, item)
     else:
 
+        field_name = filter_input.field.name
+
         # validate if filter is on JSONField
-        model_field = model._meta.get_field(filter_input.field.name)
+        metadata_column = get_metadata_column(model, field_name)
+        model_field = metadata_column.field if metadata_column else model._meta.get_field(field_name)
+
+        if filter_input.path or filter_input.operator.name in ("jsonContains", "hasKey"):
+            return build_json_criteria(model_field, filter_input)
+
+        if filter_input.operator.name in LIST_OPERATORS:
+            return build_list_criteria(field_name, model_field, filter_input)
 
         json_field = None
         value = filter_input.value
@@ -187,6 +359,12 @@ def build_filter_criteria(model, filter_input):
         if filter_input.value and filter_input.value_type:
             value = filter_input.value_type.value(value)
 
+        # keys with a metadata column are filtered on it
+        if json_field:
+            metadata_column = get_metadata_column(model, json_field, field_name)
+            if metadata_column and is_column_value(metadata_column, value):
+                field_name, json_field = metadata_column.name, None
+
         # validate match between operator and value
         validate_value_n_operator(value, filter_input.value_type, filter_input.operator)
 
@@ -212,20 +390,71 @@ def build_filter_criteria(model, filter_input):
                 op = op[4:]
                 q = ~Q(
                     **{
-                        f"{filter_input.field.name}__{json_field}__{op}": value
+                        f"{field_name}__{json_field}__{op}": value
                     }
                 )
             else:
                 q = Q(
                     **{
-                        f"{filter_input.field.name}__{json_field}__{op}": value
+                        f"{field_name}__{json_field}__{op}": value
                     }
                 )
         else:
             if op.startswith("not_"):
                 op = op[4:]
-                q = ~Q(**{f"{filter_input.field.name}__{op}": value})
+                q = ~Q(**{f"{field_name}__{op}": value})
             else:
-                q = Q(**{f"{filter_input.field.name}__{op}": value})
+                q = Q(**{f"{field_name}__{op}": value})
 
     return q
+
+
+# compiled filters of every model, by their normalized tree
+filter_cache = LRUCache(settings.FILTER_CACHE_SIZE)
+
+
+def normalize_filter(filter_input, depth=1, nodes=None):
+    """
+    Returns a hashable key of a filter tree, the same for equivalent trees,
+    e.g. with the conditions of an AND in another order. Trees deeper or
+    bigger than the limits in settings are rejected.
+    """
+    nodes = nodes if nodes is not None else [0]
+    nodes[0] += 1
+    if depth > settings.FILTER_MAX_DEPTH:
+        raise GraphQLError(
+            "Filters can't be nested more than %s levels" % settings.FILTER_MAX_DEPTH
+        )
+    if nodes[0] > settings.FILTER_MAX_NODES:
+        raise GraphQLError(
+            "Filters can't have more than %s conditions" % settings.FILTER_MAX_NODES
+        )
+
+    operator = filter_input.operator.name if filter_input.operator else None
+    if filter_input.filters:
+        children = [normalize_filter(item, depth + 1, nodes) for item in filter_input.filters]
+        return (operator, tuple(sorted(children, key=repr)))
+
+    return (
+        operator,
+        filter_input.field.name if filter_input.field else None,
+        filter_input.value,
+        tuple(filter_input.values or ()),
+        filter_input.value_type.name if filter_input.value_type else None,
+        tuple(filter_input.path or ()),
+    )
+
+
+def compile_filter(model, filter_input):
+    """
+    Returns the criteria of a filter tree, see build_filter_criteria. The
+    criteria are cached by the normalized tree, so the same filters sent
+    again are not parsed and built again. The cached Q objects are shared,
+    combine them into new ones instead of changing them.
+    """
+    key = (model._meta.label, normalize_filter(filter_input))
+    q = filter_cache.get(key)
+    if q is None:
+        q = build_filter_criteria(model, filter_input)
+        filter_cache.set(key, q)
+    return q
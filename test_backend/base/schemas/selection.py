@@ -0,0 +1,110 @@
+from django.core.exceptions import FieldDoesNotExist
+from graphene.utils.str_converters import to_camel_case
+from graphql import GraphQLObjectType, get_named_type
+from graphql.execution.collect_fields import collect_sub_fields
+
+
+def get_selection(info, field_nodes=None):
+    """
+    Returns the fields selected in the field being resolved, or in the
+    given field nodes, as a dict of {field name: sub selection}.
+
+    Fragments, aliases and the skip and include directives are resolved,
+    and a field selected several times has its sub selections merged.
+    """
+    return _collect_selection(
+        info, get_named_type(info.return_type), field_nodes or info.field_nodes
+    )
+
+
+def _collect_selection(info, graphql_type, field_nodes):
+    selection = {}
+    if not isinstance(graphql_type, GraphQLObjectType):
+        return selection
+
+    sub_fields = collect_sub_fields(
+        info.schema, info.fragments, info.variable_values, graphql_type, field_nodes
+    )
+    for nodes in sub_fields.values():
+        name = nodes[0].name.value
+        field = graphql_type.fields.get(name)
+        sub_selection = (
+            _collect_selection(info, get_named_type(field.type), nodes) if field else {}
+        )
+        selection[name] = _merge(selection.get(name, {}), sub_selection)
+
+    return selection
+
+
+def _merge(first, second):
+    merged = dict(first)
+    for name, sub_selection in second.items():
+        merged[name] = _merge(merged.get(name, {}), sub_selection)
+    return merged
+
+
+def is_selected(selection, *path):
+    """
+    Checks if a field is selected, given its path of field names.
+    """
+    for name in path:
+        if name not in selection:
+            return False
+        selection = selection[name]
+    return True
+
+
+def get_query_fields(object_type, selection, extra=()):
+    """
+    Returns the names of the model fields needed to resolve the selection
+    of a DjangoObjectType, as the columns to load with QuerySet.only() and
+    the relations to load with QuerySet.prefetch_related().
+
+    Fields with their own resolver declare the model fields they read in
+    the field_dependencies dict of the type. Returns None when a selected
+    field can't be mapped, so the whole rows are loaded.
+    """
+    model = object_type._meta.model
+    dependencies = getattr(object_type, "field_dependencies", {})
+    graphql_names = {
+        getattr(field, "name", None) or to_camel_case(name): name
+        for name, field in object_type._meta.fields.items()
+    }
+
+    only = {model._meta.pk.name, *extra}
+    prefetch = set()
+    for graphql_name, sub_selection in selection.items():
+        if graphql_name.startswith("__"):
+            continue
+
+        name = graphql_names.get(graphql_name)
+        if name is None:
+            return None
+
+        for field_name in dependencies.get(name, (name,)):
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                return None
+
+            if field.concrete and not field.many_to_many:
+                only.add(field.name)
+
+            # related objects are loaded for all the rows at once
+            if field.is_relation and (not field.concrete or field.many_to_many or sub_selection):
+                prefetch.add(field.name if field.concrete else field.get_accessor_name())
+
+    return only, prefetch
+
+
+def optimize_queryset(queryset, object_type, selection, extra=()):
+    """
+    Loads only the columns and relations used by the selection of a
+    DjangoObjectType.
+    """
+    query_fields = get_query_fields(object_type, selection, extra)
+    if query_fields is None:
+        return queryset
+
+    only, prefetch = query_fields
+    return queryset.only(*only).prefetch_related(*prefetch)
@@ -1,6 +1,9 @@
 import graphene
 from typing import Optional
+from django.db.models import JSONField
+from graphql import GraphQLError
 
+from test_backend.base.metadata_columns import KEY_REGEX, parse_metadata_key, with_metadata_columns
 from test_backend.base.schemas.search import create_field_enum
 
 
@@ -13,6 +16,16 @@ class SortInputTypeEnum(graphene.Enum):
     ASC = "asc"
 
 
+class SortCastEnum(graphene.Enum):
+    """
+    Supported types of the JSON keys to sort with
+    """
+
+    TEXT = "text"
+    NUMBER = "number"
+    DATETIME = "datetime"
+
+
 class SortTypeInput(graphene.InputObjectType):
     """
     An generic input type to filter querysets.
@@ -20,6 +33,12 @@ class SortTypeInput(graphene.InputObjectType):
 
     field: Optional[graphene.Field] = None
     order = graphene.Field(SortInputTypeEnum)
+    key = graphene.String(
+        description="Key of the JSON field to sort with, dot separated for nested keys"
+    )
+    cast = graphene.Field(
+        SortCastEnum, description="Type of the values of the key, TEXT by default"
+    )
 
     @classmethod
     def input_type(cls, model_class):
@@ -37,16 +56,51 @@ class SortTypeInput(graphene.InputObjectType):
         )
 
 
-def sort_queryset(qs, sort):
+def get_sort_key(model, sort_item):
+    """
+    Returns the name of the column of a key of a JSON field to sort with,
+    see MetadataKey.
+    """
+    if not isinstance(model._meta.get_field(sort_item.field.name), JSONField):
+        raise GraphQLError("Field %s is not a JSON field" % sort_item.field.name)
+
+    path = sort_item.key.split(".")
+    if not all(KEY_REGEX.match(key) for key in path):
+        raise GraphQLError(
+            "Sort keys can only have letters, numbers and single underscores"
+        )
+
+    cast = sort_item.cast.value if sort_item.cast else "text"
+    return parse_metadata_key(model, "__".join([sort_item.field.name, *path, cast])).name
+
+
+def get_sort_params(sort, model=None):
     """
-    Helper function to sort queryset by sort items in sort list.
+    Helper function to get the order_by params of the sort items in sort list.
     """
 
     sort_params = []
     for sort_item in sort:
+        name = sort_item.field.name
+        if sort_item.key and model is not None:
+            name = get_sort_key(model, sort_item)
+
         if sort_item.order.name == "DESC":
-            sort_params.append("-" + sort_item.field.name)
+            sort_params.append("-" + name)
         else:
-            sort_params.append(sort_item.field.name)
+            sort_params.append(name)
+
+    return sort_params
+
+
+def sort_queryset(qs, sort):
+    """
+    Helper function to sort queryset by sort items in sort list, with the
+    pk as the last one to break ties.
+    """
 
+    sort_params = get_sort_params(sort, qs.model)
+    if not any(param.lstrip("-") in ("pk", "id") for param in sort_params):
+        sort_params.append("-pk" if sort_params and sort_params[-1].startswith("-") else "pk")
+    qs = with_metadata_columns(qs, [param.lstrip("-") for param in sort_params])
     return qs.order_by(*sort_params)
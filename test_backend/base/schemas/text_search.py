@@ -0,0 +1,80 @@
+import graphene
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest, Upper
+
+
+class SearchModeEnum(graphene.Enum):
+    """
+    Supported search modes
+    """
+
+    CONTAINS = "contains"
+    PREFIX = "prefix"
+    FUZZY = "fuzzy"
+    FULL_TEXT = "full_text"
+
+
+class TextSearch:
+    """
+    Searches a text in some fields of a model, using the indexes created
+    for it (see the indexes of the models):
+
+        - CONTAINS and PREFIX match the text anywhere or at the start of
+          the fields, ignoring case, with trigram GIN indexes on UPPER(field).
+        - FUZZY matches similar texts with the same trigram indexes, ranked
+          by similarity.
+        - FULL_TEXT matches words, with web search syntax, against a search
+          vector with its own GIN index, ranked by relevance.
+
+    The ranked modes annotate the queryset with search_rank.
+    """
+
+    def __init__(self, fields, search_vector=None, config="simple"):
+        self.fields = fields
+        self.search_vector = search_vector
+        self.config = config
+
+    def __call__(self, text, search_mode=None):
+        """
+        Returns a function that applies the search to a queryset.
+        """
+        mode = search_mode.name if search_mode else "CONTAINS"
+        if mode == "FULL_TEXT" and self.search_vector is None:
+            mode = "CONTAINS"
+
+        def search(queryset):
+            return getattr(self, f"search_{mode.lower()}")(queryset, text)
+
+        return search
+
+    def search_contains(self, queryset, text):
+        q = Q()
+        for field in self.fields:
+            q |= Q(**{f"{field}__icontains": text})
+        return queryset.filter(q)
+
+    def search_prefix(self, queryset, text):
+        q = Q()
+        for field in self.fields:
+            q |= Q(**{f"{field}__istartswith": text})
+        return queryset.filter(q)
+
+    def search_fuzzy(self, queryset, text):
+        # the expressions must be the indexed ones, UPPER(field)
+        aliases = {f"_search_{field}": Upper(field) for field in self.fields}
+        q = Q()
+        for alias in aliases:
+            q |= Q(**{f"{alias}__trigram_similar": text.upper()})
+
+        similarities = [TrigramSimilarity(Upper(field), text.upper()) for field in self.fields]
+        rank = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+        return queryset.alias(**aliases).filter(q).annotate(search_rank=rank)
+
+    def search_full_text(self, queryset, text):
+        query = SearchQuery(text, config=self.config, search_type="websearch")
+        return (
+            queryset.alias(_search_vector=self.search_vector())
+            .filter(_search_vector=query)
+            .annotate(search_rank=SearchRank(self.search_vector(), query))
+        )
@@ -0,0 +1,38 @@
+from django.contrib.auth import authenticate
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import View
+from graphql_jwt.exceptions import JSONWebTokenError
+
+
+def error_response(message, status=400, field=None):
+    """
+    JSON error body shaped like the errors of the GraphQL API.
+    """
+    error = {"message": message}
+    if field:
+        error["field"] = field
+    return JsonResponse({"errors": [error]}, status=status)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AuthenticatedView(View):
+    """
+    Base view for plain HTTP endpoints. Requests are authenticated the
+    same way as the GraphQL API, with the session or the JWT header.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            try:
+                user = authenticate(request=request)
+            except JSONWebTokenError as e:
+                return error_response(str(e), status=401)
+
+            if user is None:
+                return error_response("Not logged in!", status=401)
+
+            request.user = user
+
+        return super().dispatch(request, *args, **kwargs)
@@ -112,6 +112,57 @@ DATABASES = {
 AUTH_USER_MODEL = "Authentication.User"
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.1/ref/settings/#caches
+
+# The results of the GraphQL queries, and the versions of the models that
+# invalidate them, are kept in the "results" cache. It must be shared by
+# all the processes of the API and the workers: the default file based
+# cache works on one host, use a cache server like redis for several hosts.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "results": {
+        "BACKEND": os.environ.get(
+            "RESULT_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": os.environ.get(
+            "RESULT_CACHE_LOCATION", os.path.join(PROJECT_ROOT, "cache", "results")
+        ),
+    },
+}
+
+# Seconds the results of the GraphQL queries are cached, 0 to disable it.
+RESULT_CACHE_TIMEOUT = int(os.environ.get("RESULT_CACHE_TIMEOUT", 60))
+
+# Limits of the GraphQL operations, checked before they run. The cost of an
+# operation is 1 for each object, times the page size of the lists (or
+# QUERY_COST_LIST_SIZE), plus QUERY_COST_FILTER for each filter node and
+# QUERY_COST_RANKED_SEARCH for fuzzy and full text searches. Operations
+# that cost more than the budget of the role of the user are rejected.
+QUERY_MAX_DEPTH = int(os.environ.get("QUERY_MAX_DEPTH", 10))
+QUERY_COST_LIST_SIZE = 10
+QUERY_COST_FILTER = 2
+QUERY_COST_RANKED_SEARCH = 50
+QUERY_COST_BUDGETS = {
+    "anonymous": int(os.environ.get("QUERY_COST_BUDGET_ANONYMOUS", 1000)),
+    "user": int(os.environ.get("QUERY_COST_BUDGET_USER", 20000)),
+    "robot": int(os.environ.get("QUERY_COST_BUDGET_ROBOT", 50000)),
+    "staff": int(os.environ.get("QUERY_COST_BUDGET_STAFF", 50000)),
+    "superuser": int(os.environ.get("QUERY_COST_BUDGET_SUPERUSER", 100000)),
+}
+
+# Milliseconds a database statement of a GraphQL request can run before it
+# is cancelled, 0 for no limit.
+QUERY_STATEMENT_TIMEOUT = int(os.environ.get("QUERY_STATEMENT_TIMEOUT", 15000))
+
+# Number of parsed GraphQL documents kept in memory by each process, and
+# the longest query, in characters, that is kept.
+DOCUMENT_CACHE_SIZE = int(os.environ.get("DOCUMENT_CACHE_SIZE", 500))
+DOCUMENT_CACHE_MAX_QUERY_SIZE = int(os.environ.get("DOCUMENT_CACHE_MAX_QUERY_SIZE", 20000))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -154,6 +205,87 @@ MEDIA_ROOT = os.path.join(PROJECT_ROOT, "uploaded")
 MEDIA_URL = "/uploaded/"
 
 
+# Seconds the signed download URLs of the files are valid for, they
+# are valid between this value and twice this value.
+MEDIA_URL_EXPIRATION = int(os.environ.get("MEDIA_URL_EXPIRATION", 3600))
+
+# Hand the transfer of downloads to the web server in front of django:
+# "x-accel-redirect" for nginx, "x-sendfile" for apache, or empty to
+# send them from django. For nginx MEDIA_ACCEL_REDIRECT_PREFIX must be an
+# internal location aliased to MEDIA_ROOT.
+MEDIA_ACCEL_REDIRECT = os.environ.get("MEDIA_ACCEL_REDIRECT", "")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+
+# Uploads are hashed, measured and sniffed while received. Files stay in
+# memory up to FILE_UPLOAD_MAX_MEMORY_SIZE bytes, and files bigger than
+# FILE_UPLOAD_MAX_SIZE bytes are rejected without reading them entirely.
+FILE_UPLOAD_HANDLERS = [
+    "test_backend.FileManagement.upload_handlers.ChecksumUploadHandler",
+]
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get("FILE_UPLOAD_MAX_MEMORY_SIZE", 2621440))
+FILE_UPLOAD_MAX_SIZE = int(os.environ.get("FILE_UPLOAD_MAX_SIZE", 10 * 1024 ** 3))
+
+# Blobs are stored in nested directories named after the first characters
+# of their digest, DEPTH levels of WIDTH characters. Existing files are moved
+# to a new layout with the migrate_file_layout command.
+FILE_STORAGE_FANOUT_DEPTH = int(os.environ.get("FILE_STORAGE_FANOUT_DEPTH", 2))
+FILE_STORAGE_FANOUT_WIDTH = int(os.environ.get("FILE_STORAGE_FANOUT_WIDTH", 2))
+
+# Uploads spooled to disk are hard linked into the storage when both are in
+# the same filesystem, they are copied otherwise.
+FILE_UPLOAD_TEMP_DIR = os.environ.get("FILE_UPLOAD_TEMP_DIR", os.path.join(MEDIA_ROOT, ".incoming"))
+
+
+# Directory where resumable upload sessions keep their partial data.
+# Kept outside MEDIA_ROOT so unfinished uploads are never served.
+UPLOAD_SESSIONS_ROOT = os.path.join(PROJECT_ROOT, "upload_sessions")
+
+# Default and maximum size in bytes of the chunks of an upload session.
+UPLOAD_SESSION_CHUNK_SIZE = int(os.environ.get("UPLOAD_SESSION_CHUNK_SIZE", 8 * 1024 * 1024))
+UPLOAD_SESSION_MAX_CHUNK_SIZE = int(os.environ.get("UPLOAD_SESSION_MAX_CHUNK_SIZE", 64 * 1024 * 1024))
+
+# Maximum number of items accepted by the batch create mutations.
+BATCH_CREATE_MAX_ITEMS = int(os.environ.get("BATCH_CREATE_MAX_ITEMS", 5000))
+
+# Rows read from the database at a time by the file exports.
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
+# Largest page of the paginated queries.
+PAGINATION_MAX_PAGE_SIZE = int(os.environ.get("PAGINATION_MAX_PAGE_SIZE", 1000))
+
+# Seconds the exact total counts of paginated queries are cached, 0 to
+# count on every query.
+PAGINATION_COUNT_CACHE_TIMEOUT = int(os.environ.get("PAGINATION_COUNT_CACHE_TIMEOUT", 30))
+
+# Limits of the facet queries: facets counted at once and buckets of each
+# facet, and seconds their counts are cached, 0 to count on every query.
+FACETS_MAX_FACETS = int(os.environ.get("FACETS_MAX_FACETS", 10))
+FACETS_MAX_BUCKETS = int(os.environ.get("FACETS_MAX_BUCKETS", 1000))
+FACETS_CACHE_TIMEOUT = int(os.environ.get("FACETS_CACHE_TIMEOUT", 30))
+
+# Limits of the nested filters of the paginated queries, bigger filters are
+# rejected before they are built.
+FILTER_MAX_DEPTH = int(os.environ.get("FILTER_MAX_DEPTH", 8))
+FILTER_MAX_NODES = int(os.environ.get("FILTER_MAX_NODES", 100))
+
+# Number of compiled filters kept in memory by each process, 0 to build
+# them on every query.
+FILTER_CACHE_SIZE = int(os.environ.get("FILTER_CACHE_SIZE", 1024))
+
+
+# Post-processing jobs of uploaded files, run by `manage.py process_file_jobs`.
+# Tasks queued for every new content
+FILE_JOBS_TASKS = ["media_info"]
+FILE_JOBS_MAX_ATTEMPTS = int(os.environ.get("FILE_JOBS_MAX_ATTEMPTS", 3))
+# seconds before the first retry, doubled on each attempt
+FILE_JOBS_RETRY_DELAY = int(os.environ.get("FILE_JOBS_RETRY_DELAY", 30))
+# seconds after which a job locked by a worker that died is run again
+FILE_JOBS_LOCK_TIMEOUT = int(os.environ.get("FILE_JOBS_LOCK_TIMEOUT", 600))
+FILE_JOBS_WORKER_PROCESSES = int(os.environ.get("FILE_JOBS_WORKER_PROCESSES", 2))
+FILE_JOBS_POLL_INTERVAL = float(os.environ.get("FILE_JOBS_POLL_INTERVAL", 2))
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
@@ -16,15 +16,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.views.decorators.csrf import csrf_exempt
-from django.conf import settings
-from django.conf.urls.static import static
 
-from graphene_file_upload.django import FileUploadGraphQLView
-from test_backend.views import PrivateGraphQLView
+from test_backend.views import PrivateGraphQLView, UploadGraphQLView
 
 urlpatterns = [
     path("", PrivateGraphQLView.as_view(graphiql=True)),
     path("admin/", admin.site.urls),
     path("accounts/",include("django.contrib.auth.urls")),
-    path("graphql/", csrf_exempt(FileUploadGraphQLView.as_view(graphiql=False))),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path("graphql/", csrf_exempt(UploadGraphQLView.as_view(graphiql=False))),
+    path("files/", include("test_backend.FileManagement.urls")),
+]
@@ -1,6 +1,151 @@
+from django.conf import settings
+from django.contrib.auth import authenticate
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import HttpError
 from graphene_file_upload.django import FileUploadGraphQLView
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast
+from graphql_jwt.exceptions import JSONWebTokenError
 
+from test_backend.base.documents import get_document, get_extensions, get_persisted_query
+from test_backend.base.query_limits import check_query_cost, statement_timeout
+from test_backend.base.result_cache import cache as result_cache, get_result_key
 
-class PrivateGraphQLView(LoginRequiredMixin, FileUploadGraphQLView):
-    pass
\ No newline at end of file
+
+class UploadGraphQLView(FileUploadGraphQLView):
+    """
+    GraphQL view of the API. Answers with 413 when the upload handlers
+    stopped an upload for being too big.
+
+    Queries are parsed and validated once per process, and can be sent as
+    persisted queries, see get_document and get_persisted_query. They are
+    rejected when too expensive and their database statements are
+    cancelled after QUERY_STATEMENT_TIMEOUT, see query_limits. Their
+    results are cached until a model they read is written, see
+    get_result_key.
+    """
+
+    def parse_body(self, request):
+        if self.get_content_type(request) == "multipart/form-data":
+            # parse the body before the files are looked up
+            request.POST
+
+            rejected = getattr(request, "rejected_upload", None)
+            if rejected:
+                raise HttpError(
+                    HttpResponse(status=413),
+                    f"File {rejected} is bigger than {settings.FILE_UPLOAD_MAX_SIZE} bytes",
+                )
+
+        return super().parse_body(request)
+
+    def authenticate(self, request):
+        """
+        Sets the user of the JWT header on the request. The JWT middleware
+        only does it while resolving, and the query budget and the cache
+        key need the user before. Invalid tokens are reported by the
+        middleware.
+        """
+        if request.user.is_authenticated:
+            return
+
+        try:
+            user = authenticate(request=request)
+        except JSONWebTokenError:
+            return
+
+        if user is not None:
+            request.user = user
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        try:
+            query = get_persisted_query(query, get_extensions(request, data))
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        # parsed and validated once per process, see get_document
+        schema = self.schema.graphql_schema
+        document, errors = get_document(schema, query)
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if request.method.lower() == "get":
+            if operation_ast and operation_ast.operation != OperationType.QUERY:
+                if show_graphiql:
+                    return None
+
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["POST"],
+                        "Can only perform a {} operation from a POST request.".format(
+                            operation_ast.operation.value
+                        ),
+                    )
+                )
+
+        # the budget and the cache key depend on the user
+        self.authenticate(request)
+
+        # expensive operations are rejected before they run
+        try:
+            check_query_cost(request, schema, document, variables, operation_name)
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e])
+
+        key = get_result_key(request, schema, document, variables, operation_name)
+        if key:
+            cached = result_cache.get(key)
+            if cached is not None:
+                return ExecutionResult(data=cached)
+
+        try:
+            timeout = statement_timeout(settings.QUERY_STATEMENT_TIMEOUT)
+            options = {
+                "root_value": self.get_root_value(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "context_value": self.get_context(request),
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                options["execution_context_class"] = self.execution_context_class
+
+            if (
+                operation_ast
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with timeout, transaction.atomic():
+                    result = execute(schema, document, **options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            with timeout:
+                result = execute(schema, document, **options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        if key and not result.errors:
+            # the download URLs in the results must still be valid
+            timeout = min(settings.RESULT_CACHE_TIMEOUT, settings.MEDIA_URL_EXPIRATION)
+            result_cache.set(key, result.data, timeout)
+        return result
+
+
+class PrivateGraphQLView(LoginRequiredMixin, UploadGraphQLView):
+    pass